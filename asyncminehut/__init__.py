@@ -1,4 +1,77 @@
-from .client import Client
-from .errors import *
-from .models import *
+import importlib
+from typing import Any, List
+
 from .meta import *
+
+# Submodules are imported on first use of one of their names, so importing the
+# package stays cheap and aiohttp is only loaded once a client needs it.
+_EXPORTS = {
+    'Client': 'client',
+    'Archive': 'archive',
+    'write_archive': 'archive',
+    'BatchResult': 'batch',
+    'ServerBatch': 'batch',
+    'CacheEntry': 'cache',
+    'CacheStats': 'cache',
+    'CacheBackend': 'cache',
+    'MemoryCache': 'cache',
+    'DiskCache': 'cache',
+    'ResponseCache': 'cache',
+    'ServerNotFound': 'errors',
+    'PluginNotFound': 'errors',
+    'Unauthorized': 'errors',
+    'APIError': 'errors',
+    'ServerIndex': 'index',
+    'Histogram': 'metrics',
+    'RequestSample': 'metrics',
+    'Metrics': 'metrics',
+    'PartialServer': 'models',
+    'ServerPlan': 'models',
+    'Pod': 'models',
+    'ServerProperties': 'models',
+    'Plugin': 'models',
+    'SimpleStats': 'models',
+    'HomepageStats': 'models',
+    'PlayerDistribution': 'models',
+    'Server': 'models',
+    'PoolStats': 'pool',
+    'TokenBucket': 'ratelimit',
+    'RateLimiter': 'ratelimit',
+    'Series': 'recorder',
+    'StatsRecorder': 'recorder',
+    'CONTROL': 'scheduler',
+    'INTERACTIVE': 'scheduler',
+    'BULK': 'scheduler',
+    'priority': 'scheduler',
+    'RequestScheduler': 'scheduler',
+    'PluginIndex': 'search',
+    'ServerSnapshot': 'snapshot',
+    'ServerEvent': 'watch',
+    'ServerOnline': 'watch',
+    'ServerOffline': 'watch',
+    'PlayerCountChanged': 'watch',
+    'MotdChanged': 'watch',
+    'PlanChanged': 'watch',
+    'ServerWatcher': 'watch',
+}
+_SUBMODULES = frozenset(_EXPORTS.values()) | {'catalog', 'constants', 'decoders', 'http', 'identity', 'stream',
+                                                'utils'}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = tuple(_EXPORTS)
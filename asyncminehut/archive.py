@@ -0,0 +1,174 @@
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b'AMHA'
+VERSION = 1
+
+# magic, version, section count, timestamp (epoch seconds)
+HEADER = struct.Struct('<4sHHd')
+# name, record count, then the offsets of the records, record offsets, keys,
+# key offsets and key rows regions
+SECTION = struct.Struct('<8sI5Q')
+OFFSET = struct.Struct('<Q')
+ROW = struct.Struct('<I')
+
+SECTIONS: Dict[str, Callable[[dict], str]] = {
+    'servers': lambda server: server.get('staticInfo', {}).get('_id'),
+    'plugins': lambda plugin: plugin.get('_id'),
+}
+
+
+def _pack(records: List[dict], key: Callable[[dict], str]) -> List[bytes]:
+    # Records are compact json, addressed through an offset table; keys are
+    # sorted with the row they belong to, so lookups binary search the file.
+    blobs = [json.dumps(record, separators=(',', ':')).encode() for record in records]
+    keys = sorted(((key(record) or '').encode(), row) for row, record in enumerate(records))
+    regions = []
+    for values in (blobs, [value for value, _ in keys]):
+        offsets, position = [0], 0
+        for value in values:
+            position += len(value)
+            offsets.append(position)
+        regions.append(b''.join(values))
+        regions.append(struct.pack(f'<{len(offsets)}Q', *offsets))
+    regions.append(struct.pack(f'<{len(keys)}I', *(row for _, row in keys)))
+    return regions
+
+
+def write_archive(path: str, servers: Iterable[dict] = (), plugins: Iterable[dict] = (),
+                  timestamp: float = None) -> None:
+    """Writes the raw server listing and plugin catalog to a binary archive.
+
+    The file is written beside ``path`` and renamed into place, so processes
+    that have the old archive open keep reading a consistent copy."""
+    sections = [(name, list(records)) for name, records in (('servers', servers), ('plugins', plugins))]
+    position = HEADER.size + SECTION.size * len(sections)
+    headers, body = [], []
+    for name, records in sections:
+        offsets = []
+        for region in _pack(records, SECTIONS[name]):
+            offsets.append(position)
+            body.append(region)
+            position += len(region)
+        headers.append(SECTION.pack(name.encode(), len(records), *offsets))
+    temp = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(sections), time.time() if timestamp is None else timestamp))
+        f.writelines(headers)
+        f.writelines(body)
+    os.replace(temp, path)
+
+
+class Section:
+    """The records of one kind in an archive, decoded one at a time."""
+
+    def __init__(self, view: memoryview, count: int, offsets: Tuple[int, ...],
+                 loads: Callable[[bytes], Any]) -> None:
+        self._view = view
+        self._count = count
+        self._records, self._record_offsets, self._keys, self._key_offsets, self._key_rows = offsets
+        self._loads = loads
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _span(self, table: int, index: int) -> Tuple[int, int]:
+        start, = OFFSET.unpack_from(self._view, table + index * OFFSET.size)
+        end, = OFFSET.unpack_from(self._view, table + (index + 1) * OFFSET.size)
+        return start, end
+
+    def raw(self, row: int) -> bytes:
+        """A method that gets the undecoded json of a record."""
+        if not 0 <= row < self._count:
+            raise IndexError(row)
+        start, end = self._span(self._record_offsets, row)
+        return bytes(self._view[self._records + start:self._records + end])
+
+    def __getitem__(self, row: int) -> Any:
+        return self._loads(self.raw(row))
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self[row] for row in range(self._count))
+
+    def _key(self, index: int) -> bytes:
+        start, end = self._span(self._key_offsets, index)
+        return bytes(self._view[self._keys + start:self._keys + end])
+
+    def get(self, key: str) -> Optional[Any]:
+        """A method that gets a record by its id, or ``None``."""
+        encoded = key.encode()
+        index, high = 0, self._count
+        while index < high:
+            middle = (index + high) // 2
+            if self._key(middle) < encoded:
+                index = middle + 1
+            else:
+                high = middle
+        if index == self._count or self._key(index) != encoded:
+            return None
+        row, = ROW.unpack_from(self._view, self._key_rows + index * ROW.size)
+        return self[row]
+
+
+class Archive:
+    """A memory-mapped archive written by ``write_archive``.
+
+    Nothing is decoded up front; records are read from the mapping when they
+    are accessed, so processes opening the same file share one copy of it in
+    the page cache."""
+
+    def __init__(self, path: str, loads: Callable[[bytes], Any] = json.loads) -> None:
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view: Optional[memoryview] = memoryview(self._mmap)
+        view = self._view
+        if len(view) < HEADER.size or view[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not an archive')
+        _, self.version, count, self.timestamp = HEADER.unpack_from(view)
+        if self.version != VERSION:
+            self.close()
+            raise ValueError(f'{path} has archive version {self.version}, expected {VERSION}')
+        self._sections: Dict[str, Section] = {}
+        for index in range(count):
+            name, records, *offsets = SECTION.unpack_from(view, HEADER.size + index * SECTION.size)
+            self._sections[name.rstrip(b'\0').decode()] = Section(view, records, tuple(offsets), loads)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the archive was written."""
+        return max(0.0, time.time() - self.timestamp)
+
+    @property
+    def servers(self) -> Section:
+        """The raw entries of the server listing."""
+        return self._sections['servers']
+
+    @property
+    def plugins(self) -> Section:
+        """The raw entries of the plugin catalog."""
+        return self._sections['plugins']
+
+    def close(self) -> None:
+        """A method that unmaps the archive. Records can't be read afterwards."""
+        self._sections = {}
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        self._mmap.close()
+
+    def __enter__(self) -> 'Archive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+__all__ = (
+    "Archive",
+    "write_archive"
+)
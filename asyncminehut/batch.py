@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable, List, Sequence
+
+from .constants import BATCH_CONCURRENCY
+from .models import Plugin, Server
+
+
+class BatchResult:
+    """The outcome of one server in a batch action."""
+    __slots__ = ('server', 'ok', 'result', 'error', 'elapsed')
+
+    def __init__(self, server: Server, ok: bool, result: Any = None, error: Exception = None,
+                 elapsed: float = 0.0) -> None:
+        self.server = server
+        self.ok = ok
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        return f'<BatchResult server={self.server!r} ok={self.ok!r} elapsed={self.elapsed:.3f}>'
+
+
+class ServerBatch:
+    """Runs a control action across many servers with at most ``concurrency``
+    requests in flight.
+
+    The cap is taken per request rather than per server, so the two-step
+    start and stop flows pipeline: one server's second step goes out while
+    others are still on their first. Every action returns one ``BatchResult``
+    per server, in input order, and never raises for a single server."""
+
+    def __init__(self, servers: Iterable[Server], concurrency: int = BATCH_CONCURRENCY) -> None:
+        self.servers: List[Server] = list(servers)
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(self, action: Callable[[Server], Awaitable[Any]]) -> List[BatchResult]:
+        async def run(server: Server) -> BatchResult:
+            start = time.perf_counter()
+            try:
+                result = await action(server)
+            except Exception as error:
+                return BatchResult(server, False, error=error, elapsed=time.perf_counter() - start)
+            return BatchResult(server, True, result=result, elapsed=time.perf_counter() - start)
+
+        return list(await asyncio.gather(*map(run, self.servers)))
+
+    def _call(self, method: Callable[..., Awaitable[Any]], *args) -> Callable[[Server], Awaitable[Any]]:
+        async def action(server: Server) -> Any:
+            async with self._semaphore:
+                return await method(server, *args)
+        return action
+
+    def _steps(self, steps: Sequence[str]) -> Callable[[Server], Awaitable[None]]:
+        async def action(server: Server) -> None:
+            for step in steps:
+                async with self._semaphore:
+                    await server._http.post(f'/server/{server.id}/{step}')
+        return action
+
+    async def start(self) -> List[BatchResult]:
+        """A method that starts every server. Requires authentication."""
+        return await self._run(self._steps(Server.START_STEPS))
+
+    async def stop(self) -> List[BatchResult]:
+        """A method that stops every server. Requires authentication."""
+        return await self._run(self._steps(Server.STOP_STEPS))
+
+    async def restart(self) -> List[BatchResult]:
+        """A method that restarts every server. Requires authentication."""
+        return await self._run(self._call(Server.restart))
+
+    async def send_command(self, command: str) -> List[BatchResult]:
+        """A method that sends a command to every server. Requires authentication."""
+        return await self._run(self._call(Server.send_command, command))
+
+    async def save_world(self) -> List[BatchResult]:
+        """A method that saves the world of every server. Requires authentication."""
+        return await self._run(self._call(Server.save_world))
+
+    async def set_visibility(self, visibility: bool) -> List[BatchResult]:
+        """A method that sets the visibility of every server. Requires authentication."""
+        return await self._run(self._call(Server.set_visibility, visibility))
+
+    async def install_plugin(self, plugin: Plugin) -> List[BatchResult]:
+        """A method that installs a plugin on every server. Requires authentication."""
+        return await self._run(self._call(Server.install_plugin, plugin))
+
+    async def uninstall_plugin(self, plugin: Plugin) -> List[BatchResult]:
+        """A method that uninstalls a plugin from every server. Requires authentication."""
+        return await self._run(self._call(Server.uninstall_plugin, plugin))
+
+
+__all__ = (
+    "BatchResult",
+    "ServerBatch"
+)
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .constants import CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, CACHE_TTLS
+
+
+class CacheEntry:
+    """A decoded response together with its validators."""
+    __slots__ = ('data', 'etag', 'last_modified', 'expires', 'size')
+
+    def __init__(self, data: Any, etag: str = None, last_modified: str = None, expires: float = 0.0,
+                 size: int = 0) -> None:
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+        self.size = size
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def validators(self) -> Dict[str, str]:
+        """The conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_dict(self) -> dict:
+        return {'data': self.data, 'etag': self.etag, 'last_modified': self.last_modified,
+                'expires': self.expires, 'size': self.size}
+
+
+class CacheStats:
+    __slots__ = ('hits', 'misses', 'revalidations', 'stores', 'evictions')
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __repr__(self) -> str:
+        value = ''.join(f' {attr}={getattr(self, attr)!r}' for attr in self.__slots__)
+        return f'<{self.__class__.__name__}{value}>'
+
+
+class CacheBackend:
+    """The storage interface of ``ResponseCache``."""
+    stats: CacheStats
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """An in-memory LRU bounded by entry count and approximate body size."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self.delete(key)
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.size += entry.size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        if (entry := self._entries.pop(key, None)) is not None:
+            self.size -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class DiskCache(CacheBackend):
+    """A directory of one json file per entry, kept across restarts."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.stats = CacheStats()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        # Write then rename so readers in other processes never see half a file.
+        temp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(entry.to_dict(), f)
+        os.replace(temp, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
+
+
+class ResponseCache:
+    """Caches decoded GET responses for the routes that have a ttl.
+
+    ``ttls`` maps route patterns to seconds; the first pattern that fully
+    matches the route wins and unmatched routes are never cached. Entries keep
+    their ``ETag``/``Last-Modified`` so expired ones are revalidated with a
+    conditional request instead of refetched."""
+
+    def __init__(self, backend: CacheBackend = None, ttls: Mapping[str, float] = None) -> None:
+        self.backend = backend if backend is not None else MemoryCache()
+        self._ttls: Tuple[Tuple[re.Pattern, float], ...] = tuple(
+            (re.compile(pattern), ttl) for pattern, ttl in (ttls if ttls is not None else CACHE_TTLS).items())
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats
+
+    def ttl(self, route: str) -> Optional[float]:
+        """The ttl of a route, or ``None`` if it is not cached."""
+        path = route.split('?', 1)[0]
+        for pattern, ttl in self._ttls:
+            if pattern.fullmatch(path):
+                return ttl
+        return None
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self.backend.get(key)
+
+    def store(self, key: str, data: Any, headers: Mapping[str, str], ttl: float, size: int = 0) -> None:
+        self.backend.set(key, CacheEntry(data, etag=headers.get('ETag'), last_modified=headers.get('Last-Modified'),
+                                         expires=time.time() + ttl, size=size))
+        self.stats.stores += 1
+
+    def revalidated(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        entry.expires = time.time() + ttl
+        self.backend.set(key, entry)
+        self.stats.revalidations += 1
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+__all__ = (
+    "CacheEntry",
+    "CacheStats",
+    "CacheBackend",
+    "MemoryCache",
+    "DiskCache",
+    "ResponseCache"
+)
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .constants import PLUGIN_CATALOG_TTL
+from .http import HTTP
+from .search import PluginIndex
+
+
+class PluginCatalog:
+    """A cached copy of the public plugin list, indexed by id and lowercased
+    name, with a full-text index rebuilt on every refresh."""
+
+    def __init__(self, http: HTTP, ttl: float = PLUGIN_CATALOG_TTL) -> None:
+        self._http = http
+        self.ttl = ttl
+
+        self._plugins: List[dict] = []
+        self._by_id: Dict[str, dict] = {}
+        self._by_name: Dict[str, dict] = {}
+        self._index: PluginIndex = PluginIndex([])
+        self._fetched_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the catalog has been fetched at least once."""
+        return self._fetched_at is not None
+
+    @property
+    def stale(self) -> bool:
+        """Whether the catalog is older than its ttl."""
+        return not self.loaded or time.monotonic() - self._fetched_at >= self.ttl
+
+    def load(self, plugins: List[dict], age: float = 0.0) -> None:
+        """A method that replaces the catalog contents and rebuilds the indexes.
+
+        ``age`` is how many seconds old the plugins already are."""
+        self._plugins = plugins
+        self._by_id = {plugin.get('_id'): plugin for plugin in plugins}
+        self._by_name = {plugin.get('name').lower(): plugin for plugin in plugins
+                         if plugin.get('name') is not None}
+        self._index = PluginIndex(plugins)
+        self._fetched_at = time.monotonic() - age
+
+    async def _fetch(self, fresh: bool) -> None:
+        data = await self._http.get('/plugins_public', fresh=fresh)
+        self.load(data.get('all'))
+
+    def refresh(self, fresh: bool = True) -> asyncio.Task:
+        """A method that starts a refresh, or returns the one already in flight.
+
+        A refresh skips the response cache, which would otherwise hand back
+        the list it replaces; only the first load, with ``fresh`` off, may be
+        answered from it."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._fetch(fresh))
+            self._refresh_task.add_done_callback(_consume_exception)
+        return self._refresh_task
+
+    async def ensure(self) -> None:
+        """A method that makes sure the catalog is usable.
+
+        The first call waits for the fetch. Once loaded, a stale catalog keeps
+        serving lookups while a refresh runs in the background."""
+        if not self.loaded:
+            await asyncio.shield(self.refresh(fresh=False))
+        elif self.stale:
+            self.refresh()
+
+    async def get_by_id(self, plugin_id: str) -> Optional[dict]:
+        """A method that gets the raw data of a plugin by an id."""
+        await self.ensure()
+        return self._by_id.get(plugin_id)
+
+    async def get_by_name(self, plugin_name: str) -> Optional[dict]:
+        """A method that gets the raw data of a plugin by a case-insensitive name."""
+        await self.ensure()
+        return self._by_name.get(plugin_name.lower())
+
+    async def search(self, query: str, platform: str = None, disabled: Optional[bool] = False,
+                     limit: int = 10) -> List[Tuple[dict, float]]:
+        """A method that ranks the raw data of plugins against a keyword query."""
+        await self.ensure()
+        return self._index.search(query, platform, disabled, limit)
+
+    async def all(self) -> List[dict]:
+        """A method that gets the raw data of every plugin."""
+        await self.ensure()
+        return self._plugins
+
+    def close(self) -> None:
+        """A method that cancels a refresh in flight."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # Background refreshes have no awaiter, so their errors are retrieved here
+    # to keep asyncio from logging them; the next ensure() will retry.
+    if not task.cancelled():
+        task.exception()
+
+
+__all__ = (
+    "PluginCatalog"
+)
@@ -1,28 +1,94 @@
-import aiohttp
 import asyncio
 import sys
-from typing import AsyncGenerator, Optional
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, AsyncGenerator, Awaitable, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple, Type, Union
 
-from .constants import CLIENT_TIMEOUT
-from .errors import ServerNotFound, PluginNotFound
+from .archive import Archive, write_archive
+from .batch import ServerBatch
+from .cache import ResponseCache
+from .catalog import PluginCatalog
+from .constants import BASE_URL, BATCH_CONCURRENCY, BULK_CONCURRENCY, CLIENT_TIMEOUT, DNS_CACHE_TTL, \
+    IDENTITY_MAP_CAPACITY, KEEPALIVE_TIMEOUT, OFFLOAD_THRESHOLD, PLUGIN_CATALOG_TTL, POOL_LIMIT, POOL_LIMIT_PER_HOST, \
+    RECORDER_INTERVAL, RETRIES, STREAM_CHUNK_SIZE, WATCH_INTERVAL
+from .decoders import Decoder, decode_items
+from .errors import APIError, ServerNotFound, PluginNotFound
 from .http import HTTP
+from .identity import IdentityMap
+from .index import ServerIndex
 from .meta import __version__
+from .metrics import Metrics
 from .models import Server, PartialServer, Plugin, SimpleStats, HomepageStats, PlayerDistribution
-from .utils import get
+from .pool import PoolStats
+from .ratelimit import RateLimiter
+from .recorder import StatsRecorder
+from .scheduler import BULK, RequestScheduler, priority
+from .snapshot import ServerSnapshot, decode_snapshot
+from .stream import iter_array
+from .watch import ALL_EVENTS, ServerEvent, ServerWatcher
+
+if TYPE_CHECKING:
+    import aiohttp
 
 
 class Client:
-    def __init__(self, auth_token: str = None, session_id: str = None, session: Optional[aiohttp.ClientSession] = None,
-                 loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
-        self._loop: asyncio.AbstractEventLoop = loop or asyncio.get_event_loop()
-        self._session: aiohttp.ClientSession = session or aiohttp.ClientSession(
-            timeout=CLIENT_TIMEOUT,
+    def __init__(self, auth_token: str = None, session_id: str = None, session: Optional['aiohttp.ClientSession'] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None, plugin_ttl: float = PLUGIN_CATALOG_TTL,
+                 cache: Optional[ResponseCache] = None, coalesce: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None, retries: int = RETRIES,
+                 connector: Optional['aiohttp.BaseConnector'] = None, limit: int = POOL_LIMIT,
+                 limit_per_host: int = POOL_LIMIT_PER_HOST, keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+                 ttl_dns_cache: Optional[int] = DNS_CACHE_TTL, base_url: str = BASE_URL,
+                 metrics: Optional[Metrics] = None, decoder: Union[str, Decoder, None] = 'auto',
+                 executor: Optional[Executor] = None, offload_threshold: int = OFFLOAD_THRESHOLD,
+                 scheduler: Optional[RequestScheduler] = None,
+                 identity_capacity: int = IDENTITY_MAP_CAPACITY) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = loop
+        self._pool: PoolStats = PoolStats()
+        self._connector = connector
+        self._connector_options = dict(limit=limit, limit_per_host=limit_per_host,
+                                       keepalive_timeout=keepalive_timeout, ttl_dns_cache=ttl_dns_cache)
+        if session is not None:
+            self._pool.connector = session.connector
+        # Without a session, one is only created for the first request, so a
+        # client that never sends one never loads aiohttp or opens a pool.
+        self._http: HTTP = HTTP(
+            session, auth_token=auth_token, session_id=session_id, cache=cache, coalesce=coalesce,
+            rate_limiter=rate_limiter, retries=retries, base_url=base_url, metrics=metrics,
+            decoder=decoder, executor=executor, offload_threshold=offload_threshold,
+            scheduler=scheduler if scheduler is not None else RequestScheduler(
+                self._budget(session, limit, limit_per_host)),
+            session_factory=self._create_session)
+        self._plugins: PluginCatalog = PluginCatalog(self._http, ttl=plugin_ttl)
+        self._servers: IdentityMap = IdentityMap(identity_capacity)
+
+    def _budget(self, session: Optional['aiohttp.ClientSession'], limit: int, limit_per_host: int) -> Optional[int]:
+        """The connections the pool allows to the api, from the session or
+        connector passed in if there is one; aiohttp takes 0 as no limit."""
+        connector = session.connector if session is not None else self._connector
+        if connector is not None:
+            limit, limit_per_host = connector.limit, connector.limit_per_host
+        limits = [value for value in (limit, limit_per_host) if value]
+        return min(limits) if limits else None
+
+    def _create_session(self) -> 'aiohttp.ClientSession':
+        import aiohttp
+        trace_configs = [self._pool.trace_config()]
+        if self._http.metrics is not None:
+            trace_configs.append(self._http.metrics.trace_config())
+        # A connector passed in may be shared between clients, so only one
+        # created here is closed with the session.
+        session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(CLIENT_TIMEOUT),
             loop=self._loop,
+            connector=self._connector or aiohttp.TCPConnector(**self._connector_options),
+            connector_owner=self._connector is None,
+            trace_configs=trace_configs,
             headers={'User-Agent': "AsyncMinehut v{} Python/{}.{} aiohttp/{}".format(
                 __version__, sys.version_info[0], sys.version_info[1], aiohttp.__version__)}
         )
-        self._http: HTTP = HTTP(
-            self._session, auth_token=auth_token, session_id=session_id)
+        self._pool.connector = session.connector
+        return session
 
     async def get_server_by_id(self, server_id: str) -> Server:
         """A method that gets a server by an id."""
@@ -30,7 +96,8 @@ class Client:
         if not data.get('ok', True):
             raise ServerNotFound(
                 'Server with id "{}" was not found.'.format(server_id))
-        return Server(self._http, data.get('server'))
+        with self._timed('/server/{id}'):
+            return self._server(data.get('server'))
 
     async def get_server_by_name(self, server_name: str) -> Server:
         """A method that gets a server by a name."""
@@ -38,14 +105,168 @@ class Client:
         if not data.get('ok', True):
             raise ServerNotFound(
                 'Server with name "{}" was not found.'.format(server_name))
-        return Server(self._http, data.get('server'))
+        with self._timed('/server/{id}'):
+            return self._server(data.get('server'))
+
+    def _server(self, data: dict) -> Server:
+        # Every lookup of a server returns the same instance while it is in
+        # use, brought up to date with the data just fetched.
+        server_id = data.get('_id')
+        if (server := self._servers.get(server_id)) is not None:
+            server._update(data)
+            return server
+        server = Server(self._http, data)
+        self._servers.add(server_id, server)
+        return server
+
+    def get_servers_by_ids(self, server_ids: Iterable[str], concurrency: int = BULK_CONCURRENCY,
+                           ordered: bool = False
+                           ) -> AsyncGenerator[Tuple[str, Union[Server, ServerNotFound]], None]:
+        """A method that gets many servers by id, at most ``concurrency`` at a time.
+
+        Yields ``(server_id, result)`` pairs in completion order, or input order
+        with ``ordered``. A missing server yields its ``ServerNotFound`` instead
+        of ending the batch."""
+        return self._bulk(self.get_server_by_id, server_ids, concurrency, ordered)
 
-    async def get_all_servers(self) -> AsyncGenerator[PartialServer, None]:
-        """A method that gets all the online servers."""
-        data = await self._http.get('/servers')
+    def get_servers_by_names(self, server_names: Iterable[str], concurrency: int = BULK_CONCURRENCY,
+                             ordered: bool = False
+                             ) -> AsyncGenerator[Tuple[str, Union[Server, ServerNotFound]], None]:
+        """A method that gets many servers by name, at most ``concurrency`` at a time.
+
+        Yields ``(server_name, result)`` pairs like ``get_servers_by_ids``."""
+        return self._bulk(self.get_server_by_name, server_names, concurrency, ordered)
+
+    @staticmethod
+    async def _bulk(fetch: Callable[[str], Awaitable[Server]], keys: Iterable[str], concurrency: int,
+                    ordered: bool) -> AsyncGenerator[Tuple[str, Union[Server, ServerNotFound]], None]:
+        async def run(index: int, key: str) -> Tuple[int, str, Union[Server, ServerNotFound]]:
+            try:
+                with priority(BULK):
+                    return index, key, await fetch(key)
+            except ServerNotFound as error:
+                return index, key, error
+
+        keys = iter(enumerate(keys))
+        pending = set()
+        finished: Dict[int, Tuple[str, Union[Server, ServerNotFound]]] = {}
+        next_index = 0
+        try:
+            while True:
+                for index, key in keys:
+                    pending.add(asyncio.ensure_future(run(index, key)))
+                    if len(pending) >= concurrency:
+                        break
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, key, result = task.result()
+                    if not ordered:
+                        yield key, result
+                    else:
+                        finished[index] = key, result
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_all_servers(self, stream: bool = False,
+                              chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncGenerator[PartialServer, None]:
+        """A method that gets all the online servers.
+
+        With ``stream`` the listing is decoded while it downloads, yielding each
+        server as soon as it is complete instead of after the whole body."""
+        if stream:
+            servers = iter_array(self._http.stream('/servers', chunk_size=chunk_size, priority=BULK), 'servers')
+            try:
+                async for server in servers:
+                    yield PartialServer(server)
+            finally:
+                await servers.aclose()
+            return
+        if self._http.executor is not None:
+            compact = self._http.compact_results
+            for server in await self._http.get_parsed('/servers', decode_items, 'servers', compact, priority=BULK):
+                yield PartialServer(self._http.loads(server) if compact else server)
+            return
+        data = await self._http.get('/servers', priority=BULK)
         for server in data.get('servers'):
             yield PartialServer(server)
 
+    async def get_servers_snapshot(self, stream: bool = False,
+                                   chunk_size: int = STREAM_CHUNK_SIZE) -> ServerSnapshot:
+        """A method that gets all the online servers as a columnar snapshot."""
+        if stream:
+            snapshot = ServerSnapshot()
+            servers = iter_array(self._http.stream('/servers', chunk_size=chunk_size, priority=BULK), 'servers')
+            try:
+                async for server in servers:
+                    snapshot.append(server)
+            finally:
+                await servers.aclose()
+            return snapshot
+        if self._http.executor is not None:
+            # The snapshot is built in the executor, so its time is in the decode phase.
+            snapshot = await self._http.get_parsed('/servers', decode_snapshot, self._http.compact_results,
+                                                   priority=BULK)
+            # Set here rather than in the worker, since not every decoder pickles.
+            snapshot.loads = self._http.loads
+            return snapshot
+        data = await self._http.get('/servers', priority=BULK)
+        with self._timed('/servers'):
+            return ServerSnapshot.from_servers(data.get('servers'))
+
+    async def get_server_index(self, index: Optional[ServerIndex] = None) -> ServerIndex:
+        """A method that gets all the online servers as a search index.
+
+        Passing a previous index updates it in place with the new listing."""
+        data = await self._http.get('/servers', priority=BULK)
+        if index is None:
+            return ServerIndex.from_servers(data.get('servers'))
+        index.update(data.get('servers'))
+        return index
+
+    async def save_archive(self, path: str) -> None:
+        """A method that writes the server listing and plugin catalog to an archive file."""
+        data = await self._http.get('/servers', priority=BULK)
+        write_archive(path, data.get('servers'), await self._plugins.all())
+
+    def load_archive(self, path: str) -> Archive:
+        """A method that opens an archive file and warms the plugin catalog from it.
+
+        The catalog keeps the archive's age, so an old archive is refreshed in
+        the background on first use. Server entries are read lazily from the
+        returned archive."""
+        archive = Archive(path, self._http.loads)
+        self._plugins.load(list(archive.plugins), archive.age)
+        return archive
+
+    async def watch_servers(self, interval: float = WATCH_INTERVAL,
+                            events: Iterable[Type[ServerEvent]] = ALL_EVENTS) -> AsyncGenerator[ServerEvent, None]:
+        """A method that polls the server listing every ``interval`` seconds and
+        yields the subscribed events for whatever changed since the last poll.
+
+        A poll that fails with an api error, a connection error or a timeout
+        is skipped, and the next one compares against the last listing that
+        came through; any other error, such as ``Unauthorized``, ends the watch."""
+        from aiohttp import ClientError
+        watcher = ServerWatcher(events)
+        loop = asyncio.get_event_loop()
+        while True:
+            started = loop.time()
+            try:
+                data = await self._http.get('/servers', priority=BULK)
+            except (APIError, ClientError, asyncio.TimeoutError):
+                # A failed poll is a gap between listings, not the end of the watch.
+                pass
+            else:
+                for event in watcher.update(data.get('servers')):
+                    yield event
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
     async def get_top_5_servers(self) -> AsyncGenerator[PartialServer, None]:
         """Get the top 5 servers."""
         data = await self._http.get('/network/top_servers')
@@ -54,9 +275,7 @@ class Client:
 
     async def get_plugin_by_id(self, plugin_id: str) -> Plugin:
         """A method that gets a plugin by an id."""
-        if not hasattr(self, '__plugins'):
-            self.__plugins = await self._http.get('/plugins_public')
-        query = get(self.__plugins.get('all'), '_id', plugin_id)
+        query = await self._plugins.get_by_id(plugin_id)
         if not query:
             raise PluginNotFound(
                 'Plugin with id "{}" was not found.'.format(plugin_id))
@@ -64,9 +283,7 @@ class Client:
 
     async def get_plugin_by_name(self, plugin_name: str) -> Plugin:
         """A method that gets a plugin by a name."""
-        if not hasattr(self, '__plugins'):
-            self.__plugins = await self._http.get('/plugins_public')
-        query = get(self.__plugins.get('all'), 'name', plugin_name.lower())
+        query = await self._plugins.get_by_name(plugin_name)
         if not query:
             raise PluginNotFound(
                 'Plugin with name "{}" was not found.'.format(plugin_name))
@@ -74,11 +291,20 @@ class Client:
 
     async def get_all_plugins(self) -> AsyncGenerator[Plugin, None]:
         """A method that gets all the plugins."""
-        if not hasattr(self, '__plugins'):
-            self.__plugins = await self._http.get('/plugins_public')
-        for plugin in self.__plugins.get('all'):
+        for plugin in await self._plugins.all():
             yield Plugin(plugin)
 
+    async def search_plugins(self, query: str, platform: str = None, disabled: Optional[bool] = False,
+                             limit: int = 10) -> List[Plugin]:
+        """A method that searches plugin names, descriptions and credits, best match first.
+
+        ``disabled`` keeps only disabled (``True``) or enabled (``False``) plugins, or both (``None``)."""
+        return [Plugin(plugin) for plugin, _ in await self._plugins.search(query, platform, disabled, limit)]
+
+    async def refresh_plugins(self) -> None:
+        """A method that refetches the plugin catalog now instead of waiting for the ttl."""
+        await asyncio.shield(self._plugins.refresh())
+
     async def get_simple_stats(self) -> SimpleStats:
         """A method that gets the simple stats."""
         data = await self._http.get('/network/simple_stats')
@@ -94,12 +320,49 @@ class Client:
         data = await self._http.get('/network/players/distribution')
         return PlayerDistribution(data)
 
+    def batch(self, servers: Iterable[Server], concurrency: int = BATCH_CONCURRENCY) -> ServerBatch:
+        """A method that groups servers to run a control action on all of them."""
+        return ServerBatch(servers, concurrency=concurrency)
+
+    def record_stats(self, interval: float = RECORDER_INTERVAL, **capacities: int) -> StatsRecorder:
+        """A method that starts recording the network stats every ``interval`` seconds."""
+        recorder = StatsRecorder(self, interval=interval, **capacities)
+        recorder.start()
+        return recorder
+
     async def create_server(self, name: str, platform: str = "java"):
         """A method that creates a server."""
         return await self._http.post('/servers/create', data={"name": name, "platform": platform})
 
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """The request instrumentation, if it was enabled."""
+        return self._http.metrics
+
+    def _timed(self, route: str) -> ContextManager[None]:
+        if self._http.metrics is None:
+            return nullcontext()
+        return self._http.metrics.timed('GET', route, 'model')
+
+    @property
+    def pool_stats(self) -> PoolStats:
+        """The connection pool usage of the session. Reuse counters are only
+        collected for sessions the client created itself."""
+        return self._pool
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """The request scheduler, with per-priority queue depth and wait times."""
+        return self._http.scheduler
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """The response cache, if one was given."""
+        return self._http.cache
+
     async def close(self) -> None:
         """A method that closes the client."""
+        self._plugins.close()
         await self._http.close()
 
 
@@ -1,13 +1,73 @@
-from aiohttp import ClientTimeout
+import re
 
-URL_REGEX = r'(((http|https)\:\/\/)?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.([a-zA-Z]){2,6}([a-zA-Z0-9\.\&\/\?\:@\-_=#%])*)'
-API_ERROR_REGEX = r'<pre>(.*)</pre>'
+URL_REGEX = re.compile(
+    r'(((http|https)\:\/\/)?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.([a-zA-Z]){2,6}([a-zA-Z0-9\.\&\/\?\:@\-_=#%])*)')
+API_ERROR_REGEX = re.compile(r'<pre>(.*)</pre>')
 BASE_URL = 'https://api.minehut.com'
-CLIENT_TIMEOUT = ClientTimeout(30)
+# Total seconds per request; a plain number so importing this module doesn't load aiohttp.
+CLIENT_TIMEOUT = 30.0
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 32
+KEEPALIVE_TIMEOUT = 30.0
+DNS_CACHE_TTL = 300
+PLUGIN_CATALOG_TTL = 300.0
+STREAM_CHUNK_SIZE = 64 * 1024
+OFFLOAD_THRESHOLD = 256 * 1024
+CACHE_TTLS = {
+    r'/plugins_public': 300.0,
+    r'/network/homepage_stats': 60.0,
+    r'/server/[^/]+': 15.0,
+}
+CACHE_MAX_ENTRIES = 1024
+BULK_CONCURRENCY = 16
+BATCH_CONCURRENCY = 16
+WATCH_INTERVAL = 5.0
+RECORDER_INTERVAL = 10.0
+RECORDER_RAW_CAPACITY = 3600
+RECORDER_MINUTE_CAPACITY = 2880
+RECORDER_HOUR_CAPACITY = 8760
+READ_RATE = 20.0
+WRITE_RATE = 5.0
+RATE_LIMIT_MIN = 0.5
+RETRIES = 3
+RETRY_BASE = 0.5
+RETRY_CAP = 30.0
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+SCHEDULER_RESERVED = 2
+SCHEDULER_MAX_WAIT = 2.0
+IDENTITY_MAP_CAPACITY = 256
 
 __all__ = (
     "URL_REGEX",
     "API_ERROR_REGEX",
     "BASE_URL",
-    "CLIENT_TIMEOUT"
+    "CLIENT_TIMEOUT",
+    "POOL_LIMIT",
+    "POOL_LIMIT_PER_HOST",
+    "KEEPALIVE_TIMEOUT",
+    "DNS_CACHE_TTL",
+    "PLUGIN_CATALOG_TTL",
+    "STREAM_CHUNK_SIZE",
+    "OFFLOAD_THRESHOLD",
+    "CACHE_TTLS",
+    "CACHE_MAX_ENTRIES",
+    "BULK_CONCURRENCY",
+    "BATCH_CONCURRENCY",
+    "WATCH_INTERVAL",
+    "RECORDER_INTERVAL",
+    "RECORDER_RAW_CAPACITY",
+    "RECORDER_MINUTE_CAPACITY",
+    "RECORDER_HOUR_CAPACITY",
+    "READ_RATE",
+    "WRITE_RATE",
+    "RATE_LIMIT_MIN",
+    "RETRIES",
+    "RETRY_BASE",
+    "RETRY_CAP",
+    "RETRY_STATUSES",
+    "CACHE_MAX_BYTES",
+    "SCHEDULER_RESERVED",
+    "SCHEDULER_MAX_WAIT",
+    "IDENTITY_MAP_CAPACITY"
 )
@@ -0,0 +1,63 @@
+import json
+from typing import Any, Callable, List, Union
+
+Decoder = Callable[[bytes], Any]
+
+
+def _orjson() -> Decoder:
+    import orjson
+    return orjson.loads
+
+
+def _msgspec() -> Decoder:
+    import msgspec
+    return msgspec.json.Decoder().decode
+
+
+def _stdlib() -> Decoder:
+    return json.loads
+
+
+BACKENDS = {
+    'orjson': _orjson,
+    'msgspec': _msgspec,
+    'json': _stdlib,
+}
+
+
+def get_decoder(decoder: Union[str, Decoder, None] = 'auto') -> Decoder:
+    """Resolves a json decoder taking the raw body bytes.
+
+    ``'auto'`` (or ``None``) picks the first installed of orjson and msgspec
+    and falls back to the standard library; a name picks that backend and a
+    callable is used as is."""
+    if callable(decoder):
+        return decoder
+    if decoder is None or decoder == 'auto':
+        for backend in ('orjson', 'msgspec'):
+            try:
+                return BACKENDS[backend]()
+            except ImportError:
+                continue
+        return _stdlib()
+    try:
+        return BACKENDS[decoder]()
+    except KeyError:
+        raise ValueError('Unknown json decoder "{}".'.format(decoder)) from None
+
+
+def decode_items(loads: Decoder, body: bytes, key: str, compact: bool = False) -> List[Union[dict, bytes]]:
+    """Decodes the array under ``key`` of a json body.
+
+    With ``compact`` each item is re-encoded to json bytes, the cheapest shape
+    to return from a worker process; the caller decodes them one at a time."""
+    items = loads(body).get(key)
+    if compact:
+        return [json.dumps(item, separators=(',', ':')).encode() for item in items]
+    return items
+
+
+__all__ = (
+    "get_decoder",
+    "decode_items"
+)
@@ -1,46 +1,329 @@
-import re
-from typing import Union
-from aiohttp import ClientResponse, ClientSession
+import asyncio
+import time
+from functools import partial
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable, Dict, Optional, Union
+from .cache import ResponseCache
+from .decoders import Decoder, get_decoder
 from .errors import APIError, Unauthorized
-from .constants import API_ERROR_REGEX, BASE_URL
-from .utils import is_valid_uuid
+from .constants import API_ERROR_REGEX, BASE_URL, OFFLOAD_THRESHOLD, RETRIES, RETRY_STATUSES, STREAM_CHUNK_SIZE
+from .metrics import Metrics, RequestSample
+from .ratelimit import RateLimiter, backoff, retry_after
+from .scheduler import RequestScheduler
+from .utils import is_valid_uuid, request_key
+
+if TYPE_CHECKING:
+    from aiohttp import ClientResponse, ClientSession
 
 
 class HTTP:
-    def __init__(self, session: ClientSession, auth_token: str = None, session_id: str = None) -> None:
-        self.session = session
-        self.headers = session.headers
+    def __init__(self, session: Optional['ClientSession'] = None, auth_token: str = None, session_id: str = None,
+                 cache: Optional[ResponseCache] = None, coalesce: bool = True,
+                 rate_limiter: Optional[RateLimiter] = None, retries: int = RETRIES, base_url: str = BASE_URL,
+                 metrics: Optional[Metrics] = None, decoder: Union[str, Decoder, None] = 'auto',
+                 executor: Optional[Executor] = None, offload_threshold: int = OFFLOAD_THRESHOLD,
+                 scheduler: Optional[RequestScheduler] = None,
+                 session_factory: Optional[Callable[[], 'ClientSession']] = None) -> None:
+        self._session = session
+        self._session_factory = session_factory
+        self.loads: Decoder = get_decoder(decoder)
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.base_url = base_url
+        self.metrics = metrics
+        # Sent with every request on top of the session's own default headers.
+        self.headers: Dict[str, str] = {}
+        self.cache = cache
+        self.coalesce = coalesce
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.retries = retries
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+        self._inflight: Dict[str, asyncio.Task] = {}
 
         if auth_token and session_id and is_valid_uuid(auth_token) and is_valid_uuid(session_id):
             self.headers['authorization'] = auth_token
             self.headers['x-session-id'] = session_id
 
-    async def get(self, route: str, to_json=True, **kwargs) -> Union[ClientResponse, dict]:
-        """A method that gets a route on the api."""
-        response = await self.session.get(BASE_URL + route, headers=self.headers, **kwargs)
-        if response.status == 403:
-            raise Unauthorized
-        if response.status != 200:
-            error = re.findall(API_ERROR_REGEX, (await response.text()))[0]
-            raise APIError(error)
-        return await response.json() if to_json else response
+    @property
+    def session(self) -> 'ClientSession':
+        """The session, created by the factory on first use."""
+        if self._session is None:
+            if self._session_factory is None:
+                from aiohttp import ClientSession
+                self._session = ClientSession()
+            else:
+                self._session = self._session_factory()
+        return self._session
 
-    async def post(self, route: str, to_json=True, **kwargs) -> Union[ClientResponse, dict]:
-        """A method that posts to a route on the api."""
-        response = await self.session.post(BASE_URL + route, headers=self.headers, **kwargs)
+    @staticmethod
+    async def _raise_for_status(response: 'ClientResponse') -> None:
         if response.status == 403:
             raise Unauthorized
         if response.status != 200:
-            if len(error := re.findall(API_ERROR_REGEX, (await response.text()))) > 0:
+            if len(error := API_ERROR_REGEX.findall((text := await response.text()))) > 0:
                 raise APIError(error[0])
+            try:
+                error = (await response.json(content_type=None))['error']
+            except (ValueError, TypeError, KeyError):
+                error = text or '{} {}'.format(response.status, response.reason)
+            raise APIError(error)
+
+    async def _request(self, method: str, route: str, headers: Optional[dict] = None,
+                       sample: Optional[RequestSample] = None, priority: Optional[str] = None,
+                       hold: bool = False, **kwargs) -> 'ClientResponse':
+        """Sends a request through the rate limiter and the scheduler.
+
+        Each attempt takes a scheduler slot once it has a token and gives it
+        back after reading the body, so no slot is held while waiting on the
+        bucket or backing off. With ``hold`` the body is left unread and the
+        caller gives the slot back once it is done with the response.
+
+        GETs are retried with jittered exponential backoff on connection errors,
+        429 and 5xx; POSTs are only retried on 429, which the api never acted on."""
+        from aiohttp import ClientConnectionError
+        bucket = self.rate_limiter.bucket(method)
+        priority = self.scheduler.resolve(method, priority)
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            since = time.perf_counter()
+            await self.scheduler.acquire(priority)
+            if sample is not None:
+                sample.add('schedule', since)
+            held = False
+            try:
+                if sample is None:
+                    response = await self.session.request(method, self.base_url + route,
+                                                          headers=headers or self.headers, **kwargs)
+                else:
+                    # Headers are in once the request returns, so this is the time to first byte.
+                    since = time.perf_counter()
+                    response = await self.session.request(method, self.base_url + route,
+                                                          headers=headers or self.headers,
+                                                          trace_request_ctx=sample, **kwargs)
+                    sample.add('ttfb', since)
+                    sample.status = response.status
+            except (ClientConnectionError, asyncio.TimeoutError):
+                if method != 'GET' or attempt >= self.retries:
+                    raise
+                delay = backoff(attempt)
             else:
-                data = await response.json()
-                raise APIError(data['error'])
-        return await response.json() if to_json else response
+                if response.status == 429:
+                    delay = retry_after(response.headers)
+                    bucket.throttled(delay)
+                else:
+                    delay = None
+                    if response.status < 500:
+                        bucket.succeeded()
+                retryable = response.status == 429 or (method == 'GET' and response.status in RETRY_STATUSES)
+                if not retryable or attempt >= self.retries:
+                    if hold:
+                        held = True
+                        return response
+                    try:
+                        await self._read(response, sample)
+                    except BaseException:
+                        response.release()
+                        raise
+                    return response
+                response.release()
+                # After a Retry-After the bucket itself holds the next attempt back.
+                if delay is None:
+                    delay = backoff(attempt)
+                else:
+                    delay = 0
+            finally:
+                if not held:
+                    self.scheduler.release()
+            attempt += 1
+            if sample is not None:
+                sample.retries = attempt
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _read(response: 'ClientResponse', sample: Optional[RequestSample]) -> bytes:
+        if sample is None:
+            return await response.read()
+        since = time.perf_counter()
+        body = await response.read()
+        sample.add('download', since)
+        sample.bytes += len(body)
+        return body
+
+    async def get(self, route: str, to_json=True, priority: str = None, fresh: bool = False,
+                  **kwargs) -> Union['ClientResponse', dict]:
+        """A method that gets a route on the api.
+
+        Concurrent json GETs of the same route and params share one request,
+        sent at the priority of the first caller. With ``fresh`` the request
+        is always sent, rather than answered from the cache or joined to one
+        already in flight; its response is still cached."""
+        if not to_json or kwargs.keys() - {'params'}:
+            return await self._send('GET', route, to_json, priority, **kwargs)
+
+        key = request_key(route, kwargs.get('params'))
+        ttl = self.cache.ttl(route) if self.cache is not None else None
+        if fresh:
+            return await self._get_json(route, key, ttl, priority, **kwargs)
+        if ttl is not None and (entry := self.cache.get(key)) is not None and entry.fresh:
+            self.cache.stats.hits += 1
+            return entry.data
+        if not self.coalesce:
+            return await self._get_json(route, key, ttl, priority, **kwargs)
+
+        if (task := self._inflight.get(key)) is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._get_json(route, key, ttl, priority, **kwargs))
+            task.add_done_callback(partial(self._finished, key))
+        # Shielded so a cancelled waiter leaves the shared request running for the others.
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _get_json(self, route: str, key: str, ttl: Optional[float], priority: Optional[str], **kwargs) -> dict:
+        entry = self.cache.get(key) if ttl is not None else None
+        headers = self.headers
+        if entry is not None and (validators := entry.validators()):
+            headers = {**headers, **validators}
+        sample = self.metrics.start('GET', route) if self.metrics is not None else None
+        response = None
+        try:
+            response = await self._request('GET', route, headers=headers, sample=sample, priority=priority, **kwargs)
+            if response.status == 304 and entry is not None:
+                self.cache.revalidated(key, entry, ttl)
+                return entry.data
+
+            await self._raise_for_status(response)
+            data, size = await self._json(response, sample)
+            if ttl is not None:
+                self.cache.stats.misses += 1
+                self.cache.store(key, data, response.headers, ttl, size=size)
+            return data
+        except BaseException as error:
+            if sample is not None:
+                sample.error = error
+            raise
+        finally:
+            if response is not None:
+                response.release()
+            if sample is not None:
+                self.metrics.finish(sample)
+
+    async def _json(self, response: 'ClientResponse', sample: Optional[RequestSample]) -> tuple:
+        """Decodes a json body already read by ``_request``, returning the data
+        and the body size."""
+        body = await response.read()
+        if sample is None:
+            return await self.offload(len(body), self.loads, body), len(body)
+        since = time.perf_counter()
+        data = await self.offload(len(body), self.loads, body)
+        sample.add('decode', since)
+        return data, len(body)
+
+    async def get_parsed(self, route: str, parse: Callable[..., Any], *args, priority: str = None) -> Any:
+        """A method that gets a json route and returns ``parse(loads, body, *args)``.
+
+        Decoding and parsing are offloaded together, so only the body goes to
+        the executor and only the parsed result comes back. That result is not
+        the route's json, so it is neither cached nor shared with concurrent
+        gets of the route; it is timed as the decode phase."""
+        sample = self.metrics.start('GET', route) if self.metrics is not None else None
+        response = None
+        try:
+            response = await self._request('GET', route, sample=sample, priority=priority)
+            await self._raise_for_status(response)
+            body = await response.read()
+            if sample is None:
+                return await self.offload(len(body), parse, self.loads, body, *args)
+            since = time.perf_counter()
+            result = await self.offload(len(body), parse, self.loads, body, *args)
+            sample.add('decode', since)
+            return result
+        except BaseException as error:
+            if sample is not None:
+                sample.error = error
+            raise
+        finally:
+            if response is not None:
+                response.release()
+            if sample is not None:
+                self.metrics.finish(sample)
+
+    async def offload(self, size: int, func: Callable[..., Any], *args) -> Any:
+        """A method that runs ``func`` in the executor when one is set and ``size``
+        bytes reach the threshold, and inline on the event loop otherwise."""
+        if self.executor is None or size < self.offload_threshold:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    @property
+    def compact_results(self) -> bool:
+        """Whether offloaded work should return compact results, because it
+        has to be pickled back from another process."""
+        from concurrent.futures import ProcessPoolExecutor
+        return isinstance(self.executor, ProcessPoolExecutor)
+
+    async def stream(self, route: str, chunk_size: int = STREAM_CHUNK_SIZE, priority: str = None,
+                     **kwargs) -> AsyncGenerator[bytes, None]:
+        """A method that gets a route on the api and yields the body in chunks as it arrives."""
+        sample = self.metrics.start('GET', route) if self.metrics is not None else None
+        response = None
+        try:
+            response = await self._request('GET', route, sample=sample, priority=priority, hold=True, **kwargs)
+            try:
+                await self._raise_for_status(response)
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    if sample is not None:
+                        sample.bytes += len(chunk)
+                    yield chunk
+            finally:
+                self.scheduler.release()
+        except BaseException as error:
+            if sample is not None and not isinstance(error, GeneratorExit):
+                sample.error = error
+            raise
+        finally:
+            if response is not None:
+                response.release()
+            if sample is not None:
+                self.metrics.finish(sample)
+
+    async def post(self, route: str, to_json=True, priority: str = None, **kwargs) -> Union['ClientResponse', dict]:
+        """A method that posts to a route on the api."""
+        return await self._send('POST', route, to_json, priority, **kwargs)
+
+    async def _send(self, method: str, route: str, to_json: bool, priority: Optional[str],
+                    **kwargs) -> Union['ClientResponse', dict]:
+        # The body is always read in full so the connection goes straight back
+        # to the pool. A returned response is not released as well, since
+        # aiohttp's read() raises "Connection closed" on a released response
+        # even when the body is cached.
+        sample = self.metrics.start(method, route) if self.metrics is not None else None
+        response = None
+        try:
+            response = await self._request(method, route, sample=sample, priority=priority, **kwargs)
+            await self._raise_for_status(response)
+            if to_json:
+                return (await self._json(response, sample))[0]
+            returned, response = response, None
+            return returned
+        except BaseException as error:
+            if sample is not None:
+                sample.error = error
+            raise
+        finally:
+            if response is not None:
+                response.release()
+            if sample is not None:
+                self.metrics.finish(sample)
 
     async def close(self) -> None:
-        """A method that closes the session."""
-        await self.session.close()
+        """A method that closes the session, if one was ever created."""
+        if self._session is not None:
+            await self._session.close()
 
 
 __all__ = (
@@ -0,0 +1,58 @@
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .constants import IDENTITY_MAP_CAPACITY
+
+
+class IdentityMap:
+    """Maps keys to the one live object for each, e.g. a ``Server`` per id.
+
+    Objects are held weakly, so one is forgotten as soon as nothing else uses
+    it; the ``capacity`` most recently used are also held strongly, so a bot
+    looking the same servers up again gets the same instances back."""
+
+    def __init__(self, capacity: int = IDENTITY_MAP_CAPACITY) -> None:
+        self.capacity = capacity
+        self._objects: 'weakref.WeakValueDictionary[Hashable, Any]' = weakref.WeakValueDictionary()
+        self._recent: 'OrderedDict[Hashable, Any]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._objects
+
+    def _touch(self, key: Hashable, value: Any) -> None:
+        if self.capacity <= 0:
+            return
+        self._recent[key] = value
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.capacity:
+            self._recent.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """A method that gets the live object for a key, if there is one."""
+        value = self._objects.get(key)
+        if value is not None:
+            self._touch(key, value)
+        return value
+
+    def add(self, key: Hashable, value: Any) -> None:
+        """A method that makes ``value`` the object for a key."""
+        self._objects[key] = value
+        self._touch(key, value)
+
+    def discard(self, key: Hashable) -> None:
+        """A method that forgets the object for a key."""
+        self._objects.pop(key, None)
+        self._recent.pop(key, None)
+
+    def clear(self) -> None:
+        self._objects.clear()
+        self._recent.clear()
+
+
+__all__ = (
+    "IdentityMap"
+)
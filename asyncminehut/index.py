@@ -0,0 +1,277 @@
+import heapq
+from collections import defaultdict
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from .models import PartialServer
+
+GRAM = 3
+# Sorts after any character in a name or id.
+LAST = '\uffff'
+
+# (name, motd, plan, visibility, platform, player_count), all the indexed fields of one server.
+Fields = Tuple[str, str, Optional[str], Optional[bool], Optional[str], int]
+
+
+def grams(text: str) -> Set[str]:
+    """The trigrams of an already lowercased string."""
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def _fields(server: dict) -> Fields:
+    static = server.get('staticInfo', {})
+    return ((server.get('name') or '').lower(), (server.get('motd') or '').lower(), static.get('rawPlan'),
+            server.get('visibility'), static.get('platform'), server.get('playerData', {}).get('playerCount') or 0)
+
+
+def _distance(a: str, b: str, limit: int) -> int:
+    """The edit distance between two strings, or ``limit + 1`` once it is
+    known to exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ServerIndex:
+    """A searchable index over the server listing.
+
+    Names and MOTDs are indexed by trigram for substring and fuzzy matching,
+    names are also kept sorted for prefix matching, and plan, visibility,
+    platform and player count have secondary indexes. ``update`` applies a
+    new listing incrementally: only servers whose indexed fields changed are
+    re-indexed, and only in the indexes those fields belong to."""
+
+    def __init__(self) -> None:
+        self._servers: Dict[str, dict] = {}
+        self._fields: Dict[str, Fields] = {}
+        self._names: List[Tuple[str, str]] = []
+        self._players: List[Tuple[int, str]] = []
+        self._name_grams: Dict[str, Set[str]] = defaultdict(set)
+        self._motd_grams: Dict[str, Set[str]] = defaultdict(set)
+        self._plan: Dict[Optional[str], Set[str]] = {}
+        self._visibility: Dict[Optional[bool], Set[str]] = {}
+        self._platform: Dict[Optional[str], Set[str]] = {}
+
+    @classmethod
+    def from_servers(cls, servers: Iterable[dict]) -> 'ServerIndex':
+        """Builds an index from the raw entries of the /servers listing."""
+        index = cls()
+        index.update(servers)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._servers)
+
+    def __contains__(self, server_id: str) -> bool:
+        return server_id in self._servers
+
+    def get(self, server_id: str) -> Optional[PartialServer]:
+        """A method that gets an indexed server by id."""
+        server = self._servers.get(server_id)
+        return None if server is None else PartialServer(server)
+
+    def update(self, servers: Iterable[dict]) -> None:
+        """A method that replaces the indexed listing with a new one.
+
+        Servers missing from the new listing are removed."""
+        gone = set(self._servers)
+        # Filling an empty index, the sorted indexes are built once at the end
+        # instead of insorting every server.
+        bulk = not self._servers
+        for server in servers:
+            server_id = server.get('staticInfo', {}).get('_id')
+            gone.discard(server_id)
+            self._add(server, not bulk)
+        for server_id in gone:
+            self.remove(server_id)
+        if bulk:
+            self._names = sorted((fields[0], server_id) for server_id, fields in self._fields.items())
+            self._players = sorted((fields[5], server_id) for server_id, fields in self._fields.items())
+
+    def add(self, server: dict) -> None:
+        """A method that indexes a raw server entry, replacing any previous
+        entry with the same id."""
+        self._add(server, True)
+
+    def _add(self, server: dict, ordered: bool) -> None:
+        server_id = server.get('staticInfo', {}).get('_id')
+        new = _fields(server)
+        old = self._fields.get(server_id)
+        self._servers[server_id] = server
+        if old == new:
+            return
+        self._fields[server_id] = new
+        old_name, old_motd, old_plan, old_visibility, old_platform, old_players = \
+            old if old is not None else (None,) * 6
+        name, motd, plan, visibility, platform, players = new
+        if old_name != name:
+            if ordered:
+                if old is not None:
+                    self._names.pop(bisect_left(self._names, (old_name, server_id)))
+                insort(self._names, (name, server_id))
+            self._regram(self._name_grams, server_id, old_name, name)
+        if old_motd != motd:
+            self._regram(self._motd_grams, server_id, old_motd, motd)
+        if old_players != players and ordered:
+            if old is not None:
+                self._players.pop(bisect_left(self._players, (old_players, server_id)))
+            insort(self._players, (players, server_id))
+        for index, before, after in ((self._plan, old_plan, plan), (self._visibility, old_visibility, visibility),
+                                     (self._platform, old_platform, platform)):
+            if old is None or before != after:
+                if old is not None:
+                    self._discard(index, before, server_id)
+                index.setdefault(after, set()).add(server_id)
+
+    def remove(self, server_id: str) -> None:
+        """A method that removes a server from the index, if it is there."""
+        if self._servers.pop(server_id, None) is None:
+            return
+        name, motd, plan, visibility, platform, players = self._fields.pop(server_id)
+        self._names.pop(bisect_left(self._names, (name, server_id)))
+        self._players.pop(bisect_left(self._players, (players, server_id)))
+        self._regram(self._name_grams, server_id, name, None)
+        self._regram(self._motd_grams, server_id, motd, None)
+        self._discard(self._plan, plan, server_id)
+        self._discard(self._visibility, visibility, server_id)
+        self._discard(self._platform, platform, server_id)
+
+    @staticmethod
+    def _discard(index: Dict[Hashable, Set[str]], value: Hashable, server_id: str) -> None:
+        ids = index.get(value)
+        if ids is not None:
+            ids.discard(server_id)
+            if not ids:
+                del index[value]
+
+    @classmethod
+    def _regram(cls, index: Dict[str, Set[str]], server_id: str, before: Optional[str], after: Optional[str]) -> None:
+        old, new = grams(before or ''), grams(after or '')
+        for gram in old - new:
+            cls._discard(index, gram, server_id)
+        for gram in new - old:
+            index[gram].add(server_id)
+
+    def _prefix(self, text: str) -> Tuple[int, int]:
+        return bisect_left(self._names, (text,)), bisect_left(self._names, (text + LAST,))
+
+    def _estimate(self, text: str, index: Dict[str, Set[str]]) -> int:
+        if len(text) < GRAM:
+            return len(self._servers)
+        return min(len(index.get(gram, ())) for gram in grams(text))
+
+    def _substring(self, text: str, field: int, index: Dict[str, Set[str]]) -> Set[str]:
+        if len(text) < GRAM:
+            return {server_id for server_id, fields in self._fields.items() if text in fields[field]}
+        postings = sorted((index.get(gram, ()) for gram in grams(text)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        if len(text) == GRAM:
+            return candidates
+        # Every trigram matching does not make the text contiguous, so verify.
+        return {server_id for server_id in candidates if text in self._fields[server_id][field]}
+
+    def _fuzzy(self, text: str, distance: int) -> Set[str]:
+        query = grams(text)
+        # Each edit breaks at most GRAM trigrams, so a match shares at least this many.
+        needed = len(query) - GRAM * distance
+        if needed <= 0:
+            candidates = self._fields.keys()
+        else:
+            # A match shares ``needed`` trigrams, so it has one of the rarest
+            # ``len(query) - needed + 1``; only their postings are read.
+            rarest = sorted(query, key=lambda gram: len(self._name_grams.get(gram, ())))[:len(query) - needed + 1]
+            fields = self._fields
+            candidates = [server_id for server_id in set().union(*(self._name_grams.get(gram, ()) for gram in rarest))
+                          if len(query & grams(fields[server_id][0])) >= needed]
+        return {server_id for server_id in candidates
+                if _distance(text, self._fields[server_id][0], distance) <= distance}
+
+    def search(self, text: str = None, *, match: str = 'substring', distance: int = 1, plan: str = None,
+               visibility: bool = None, platform: str = None, min_players: int = None, max_players: int = None,
+               limit: int = None) -> List[PartialServer]:
+        """A method that finds servers matching a text query and filters.
+
+        ``match`` is ``'prefix'`` or ``'fuzzy'`` (within ``distance`` edits)
+        against names, or ``'substring'`` against names and MOTDs; matching
+        ignores case. Results are ordered by player count, highest first.
+
+        The most selective index is used to produce candidates that the other
+        conditions are checked against; when a ``limit`` is given and every
+        condition is broad, servers are instead walked in player count order
+        until enough match."""
+        players = self._players
+        first = 0 if min_players is None else bisect_left(players, (min_players,))
+        last = len(players) if max_players is None else bisect_right(players, (max_players, LAST))
+        # One (estimated size, candidate producer, check) per condition.
+        conditions: List[Tuple[int, Callable[[], Iterable[str]], Callable[[Fields], bool]]] = []
+        if text is not None:
+            text = text.lower()
+            if match == 'prefix':
+                start, end = self._prefix(text)
+                conditions.append((end - start, lambda: [server_id for _, server_id in self._names[start:end]],
+                                   lambda fields: fields[0].startswith(text)))
+            elif match == 'substring':
+                conditions.append((
+                    self._estimate(text, self._name_grams) + self._estimate(text, self._motd_grams),
+                    lambda: self._substring(text, 0, self._name_grams) | self._substring(text, 1, self._motd_grams),
+                    lambda fields: text in fields[0] or text in fields[1]))
+            elif match == 'fuzzy':
+                conditions.append((0, lambda: self._fuzzy(text, distance),
+                                   lambda fields: _distance(text, fields[0], distance) <= distance))
+            else:
+                raise ValueError(f'unknown match {match!r}')
+        for position, index, value in ((2, self._plan, plan), (3, self._visibility, visibility),
+                                       (4, self._platform, platform)):
+            if value is not None:
+                ids = index.get(value, ())
+                conditions.append((len(ids), lambda ids=ids: ids,
+                                   lambda fields, position=position, value=value: fields[position] == value))
+        if min_players is not None or max_players is not None:
+            low = float('-inf') if min_players is None else min_players
+            high = float('inf') if max_players is None else max_players
+            conditions.append((last - first, lambda: [server_id for _, server_id in players[first:last]],
+                               lambda fields: low <= fields[5] <= high))
+
+        fields, total = self._fields, len(self._servers) or 1
+        checks = [check for _, _, check in conditions]
+        # Rows walked before ``limit`` matches, assuming independent conditions.
+        selectivity = 1.0
+        for size, _, _ in conditions:
+            selectivity *= size / total
+        smallest = min(conditions, key=lambda condition: condition[0], default=None)
+        if limit is not None and (smallest is None or limit / (selectivity or 1 / total) < smallest[0]):
+            ranked: List[str] = []
+            for position in range(last - 1, first - 1, -1):
+                server_id = players[position][1]
+                row = fields[server_id]
+                for check in checks:
+                    if not check(row):
+                        break
+                else:
+                    ranked.append(server_id)
+                    if len(ranked) == limit:
+                        break
+        else:
+            if smallest is None:
+                ids = list(self._servers)
+            else:
+                others = [check for check in checks if check is not smallest[2]]
+                ids = smallest[1]()
+                for check in others:
+                    ids = [server_id for server_id in ids if check(fields[server_id])]
+            key = lambda server_id: fields[server_id][5]
+            ranked = sorted(ids, key=key, reverse=True) if limit is None else heapq.nlargest(limit, ids, key=key)
+        return [PartialServer(self._servers[server_id]) for server_id in ranked]
+
+
+__all__ = (
+    "ServerIndex"
+)
@@ -0,0 +1,202 @@
+import logging
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+from .utils import route_template
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession, TraceConfig
+
+log = logging.getLogger(__name__)
+
+BUCKETS = tuple(0.0001 * 2 ** exponent for exponent in range(20))
+
+
+class Histogram:
+    """Latencies in log-spaced buckets from 0.1 ms to about 52 s."""
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self) -> None:
+        self.counts = array('L', bytes(array('L').itemsize * (len(BUCKETS) + 1)))
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """The upper bound of the bucket holding the ``q``-th percentile (0-100),
+        capped at the largest value seen."""
+        rank = self.count * q / 100
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(BUCKETS[bucket], self.max) if bucket < len(BUCKETS) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+class RequestSample:
+    """The phases of one request, filled in by ``HTTP`` and the session trace."""
+    __slots__ = ('method', 'route', 'status', 'retries', 'bytes', 'phases', 'started', 'error', '_marks')
+
+    def __init__(self, method: str, route: str) -> None:
+        self.method = method
+        self.route = route
+        self.status: Optional[int] = None
+        self.retries = 0
+        self.bytes = 0
+        self.phases: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self.error: Optional[BaseException] = None
+        self._marks: Dict[str, float] = {}
+
+    def add(self, phase: str, since: float) -> float:
+        """Adds the time since ``since`` to a phase and returns the current time."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - since
+        return now
+
+    def __repr__(self) -> str:
+        return f'<RequestSample {self.method} {self.route} status={self.status!r} phases={self.phases!r}>'
+
+
+class RouteStats:
+    __slots__ = ('requests', 'errors', 'retries', 'bytes', 'statuses', 'phases')
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.statuses: Dict[int, int] = {}
+        self.phases: Dict[str, Histogram] = {}
+
+    def observe(self, phase: str, value: float) -> None:
+        if (histogram := self.phases.get(phase)) is None:
+            histogram = self.phases[phase] = Histogram()
+        histogram.add(value)
+
+    def snapshot(self) -> dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'bytes': self.bytes,
+            'statuses': dict(self.statuses),
+            'phases': {phase: histogram.snapshot() for phase, histogram in self.phases.items()},
+        }
+
+
+class Metrics:
+    """Per-route latency histograms and counters for an ``HTTP``.
+
+    Routes are grouped by template, e.g. ``GET /server/{id}``. Every finished
+    request is also passed to each exporter, a callable taking the
+    ``RequestSample``; an exporter that raises is logged and skipped. Nothing
+    is measured unless a ``Metrics`` is given to the client; the connection
+    and DNS phases need the trace config from ``trace_config()`` on the
+    session, which ``Client`` adds itself."""
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, RouteStats] = {}
+        self.exporters: List[Callable[[RequestSample], None]] = []
+
+    def add_exporter(self, exporter: Callable[[RequestSample], None]) -> None:
+        self.exporters.append(exporter)
+
+    def _route(self, method: str, route: str) -> RouteStats:
+        name = '{} {}'.format(method, route)
+        if (stats := self.routes.get(name)) is None:
+            stats = self.routes[name] = RouteStats()
+        return stats
+
+    def start(self, method: str, route: str) -> RequestSample:
+        return RequestSample(method, route_template(route))
+
+    def finish(self, sample: RequestSample) -> None:
+        sample.add('total', sample.started)
+        stats = self._route(sample.method, sample.route)
+        stats.requests += 1
+        stats.retries += sample.retries
+        stats.bytes += sample.bytes
+        if sample.status is not None:
+            stats.statuses[sample.status] = stats.statuses.get(sample.status, 0) + 1
+        if sample.error is not None:
+            stats.errors += 1
+        for phase, value in sample.phases.items():
+            stats.observe(phase, value)
+        for exporter in self.exporters:
+            # Called from the request's finally block, so a failing exporter
+            # must not replace the request's own result or error.
+            try:
+                exporter(sample)
+            except Exception:
+                log.exception('metrics exporter %r failed', exporter)
+
+    @contextmanager
+    def timed(self, method: str, route: str, phase: str) -> Iterator[None]:
+        """Times a block, such as building models from a response, as a phase of a route."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._route(method, route_template(route)).observe(phase, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        """The current counters and histogram summaries of every route."""
+        return {route: stats.snapshot() for route, stats in self.routes.items()}
+
+    def reset(self) -> None:
+        self.routes.clear()
+
+    def trace_config(self) -> 'TraceConfig':
+        from aiohttp import TraceConfig
+        config = TraceConfig()
+        for phase, start, end in (('queue', config.on_connection_queued_start, config.on_connection_queued_end),
+                                  ('dns', config.on_dns_resolvehost_start, config.on_dns_resolvehost_end),
+                                  ('connect', config.on_connection_create_start, config.on_connection_create_end)):
+            start.append(_trace_start(phase))
+            end.append(_trace_end(phase))
+        return config
+
+
+def _trace_start(phase: str):
+    async def hook(session: 'ClientSession', context: SimpleNamespace, params) -> None:
+        if isinstance(context.trace_request_ctx, RequestSample):
+            context.trace_request_ctx._marks[phase] = time.perf_counter()
+    return hook
+
+
+def _trace_end(phase: str):
+    async def hook(session: 'ClientSession', context: SimpleNamespace, params) -> None:
+        sample = context.trace_request_ctx
+        if isinstance(sample, RequestSample) and (since := sample._marks.pop(phase, None)) is not None:
+            sample.add(phase, since)
+    return hook
+
+
+__all__ = (
+    "Histogram",
+    "RequestSample",
+    "Metrics"
+)
@@ -1,17 +1,95 @@
-import re
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, FrozenSet, List, Optional
 import datetime
 
 
 from .constants import URL_REGEX
 from .http import HTTP
-from .errors import APIError
+from .errors import APIError, ServerNotFound
 
 
-class Model:
+class field:
+    """A model attribute decoded from the raw data on first access.
+
+    ``ModelMeta`` turns every field into a real slot of the same name, so once
+    decoded the value is read straight from the slot and models never carry an
+    instance ``__dict__``. ``keys`` names the raw keys the value is decoded
+    from; a field without them is assumed to depend on all of the data."""
+    __slots__ = ('decode', 'keys')
+
+    def __init__(self, decode: Callable[['Model'], Any], *keys: str) -> None:
+        self.decode = decode
+        self.keys: Optional[FrozenSet[str]] = frozenset(keys) if keys else None
+
+
+def key(name: str, default: Any = None) -> field:
+    """A field that reads a single key of the raw data."""
+    return field(lambda self: self.data.get(name, default), name)
+
+
+def timestamp(value: Optional[float]) -> Optional[datetime.datetime]:
+    """Converts a millisecond epoch from the api to an aware datetime."""
+    if value is None:
+        return None
+    return datetime.datetime.fromtimestamp(value/1000.0, tz=datetime.timezone.utc)
+
+
+class ModelMeta(type):
+    def __new__(mcs, name: str, bases: tuple, namespace: dict):
+        fields = {attr: namespace.pop(attr) for attr, value in list(namespace.items())
+                  if isinstance(value, field)}
+        namespace['__slots__'] = tuple(namespace.get('__slots__', ())) + tuple(fields)
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls._fields = {**getattr(cls, '_fields', {}), **{attr: value.decode for attr, value in fields.items()}}
+        cls._keys = {**getattr(cls, '_keys', {}), **{attr: value.keys for attr, value in fields.items()}}
+        return cls
+
+
+class Model(metaclass=ModelMeta):
+    __slots__ = ('data',)
+    _fields: dict = {}
+    _keys: dict = {}
+    _repr_attrs: tuple = ()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached while the slot is still empty.
+        try:
+            decode = self._fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        value = decode(self)
+        setattr(self, name, value)
+        return value
+
+    def _update(self, data: dict) -> List[str]:
+        """Swaps in new raw data and returns the names of the fields it changed.
+
+        Decoded values of changed fields are dropped to be decoded again on
+        access, except nested models, which are updated in place so references
+        to them stay current."""
+        old, self.data = self.data, data
+        changed_keys = {name for name in old.keys() | data.keys() if old.get(name) != data.get(name)}
+        if not changed_keys:
+            return []
+        changed = []
+        for name, keys in self._keys.items():
+            if keys is not None and keys.isdisjoint(changed_keys):
+                continue
+            changed.append(name)
+            try:
+                value = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+            if isinstance(value, Model) and isinstance(value.data, dict):
+                new = self._fields[name](self)
+                if type(new) is type(value):
+                    value._update(new.data)
+                    continue
+            delattr(self, name)
+        return changed
+
     def __repr__(self) -> str:
         value = ''.join(
-            f' {attr}={getattr(self, attr)!r}' for attr in self.__slots__)
+            f' {attr}={getattr(self, attr)!r}' for attr in self._repr_attrs)
         return f'<{self.__class__.__name__}{value}>'
 
     def __str__(self) -> str:
@@ -27,181 +105,183 @@ class Model:
 
 
 class PartialServer(Model):
-    __slots__ = ('id', 'name')
+    _repr_attrs = ('id', 'name')
 
     def __init__(self, data: dict) -> None:
         self.data: dict = data
 
-        self.static = data.get('staticInfo', {})
-        self.id = self.static.get('_id')
-        self.plan = ServerPlan(self.static.get(
-            'rawPlan'), self.static.get('planMaxPlayers'))
-        self.service_start_date = datetime.datetime.fromtimestamp(
-            (self.static.get('serviceStartDate'))/1000.0, tz=datetime.timezone.utc)
+    static = field(lambda self: self.data.get('staticInfo', {}))
+    id = field(lambda self: self.static.get('_id'))
+    plan = field(lambda self: ServerPlan(self.static.get(
+        'rawPlan'), self.static.get('planMaxPlayers')))
+    service_start_date = field(lambda self: timestamp(self.static.get('serviceStartDate')))
 
-        self.max_players = data.get('maxPlayers')
-        self.name = data.get('name')
-        self.motd = data.get('motd')
-        self.icon = data.get('icon')
-        self.visibility = data.get('visibility')
+    max_players = key('maxPlayers')
+    name = key('name')
+    motd = key('motd')
+    icon = key('icon')
+    visibility = key('visibility')
 
-        self.save = data.get('saveData', {})
-        if (last_save := self.save.get('lastSave')) is not None:
-            self.last_save = datetime.datetime.fromtimestamp(
-                last_save/1000.0, tz=datetime.timezone.utc)
+    save = key('saveData', {})
+    last_save = field(lambda self: timestamp(self.save.get('lastSave')))
 
-        self.player_data = data.get('playerData', {})
-        self.player_count = self.player_data.get('playerCount')
+    player_data = key('playerData', {})
+    player_count = field(lambda self: self.player_data.get('playerCount'))
 
-        self.pod = Pod(data.get('podInfo', {}))
+    pod = field(lambda self: Pod(self.data.get('podInfo', {})))
 
 
 class ServerPlan(Model):
-    __slots__ = ('name', 'max_players')
+    _repr_attrs = ('name', 'max_players')
 
     def __init__(self, *args) -> None:
         self.data: tuple = tuple(args)
 
-        self.name, self.max_players = self.data
+    name = field(lambda self: self.data[0])
+    max_players = field(lambda self: self.data[1])
 
 
 class Pod(Model):
-    __slots__ = ('instance', 'sidecar')
+    _repr_attrs = ('instance', 'sidecar')
 
     def __init__(self, data: dict) -> None:
         self.data: dict = data
 
-        self.instance = data.get('instance')
-        self.sidecar = data.get('instance-sidecar')
+    instance = key('instance')
+    sidecar = key('instance-sidecar')
 
 
 class ServerProperties(Model):
-    __slots__ = ()
-
     def __init__(self, data: dict) -> None:
         self.data: dict = data
 
-        self.max_players = data.get('max_players')
-        self.gamemode = data.get('gamemode')
-        self.allow_flight = data.get('allow_flight')
-        self.spawn_animals = data.get('spawn_animals')
-        self.spawn_mobs = data.get('spawn_mobs')
-        self.force_gamemode = data.get('force_gamemode')
-        self.hardcore = data.get('hardcore')
-        self.pvp = data.get('pvp')
-        self.difficulty = data.get('difficulty')
-        self.level_seed = data.get('level_seed')
-        self.allow_nether = data.get('allow_nether')
-        self.generate_structures = data.get('generate_structures')
-        self.command_blocks = data.get('enable_command_block')
-        self.announce_player_achievements = data.get(
-            'annouce_player_achievements')
-        self.level_type = data.get('level_type')
-        self.level_name = data.get('level_name')
-        self.generator_settings = data.get('generator_settings')
-        self.resource_pack = data.get('resource_pack')
-        self.resource_pack_sha1 = data.get('resource_pack_sha1')
-        self.view_distance = data.get('view_distance')
-        self.spawn_protection = data.get('spawn_protection')
+    max_players = key('max_players')
+    gamemode = key('gamemode')
+    allow_flight = key('allow_flight')
+    spawn_animals = key('spawn_animals')
+    spawn_mobs = key('spawn_mobs')
+    force_gamemode = key('force_gamemode')
+    hardcore = key('hardcore')
+    pvp = key('pvp')
+    difficulty = key('difficulty')
+    level_seed = key('level_seed')
+    allow_nether = key('allow_nether')
+    generate_structures = key('generate_structures')
+    command_blocks = key('enable_command_block')
+    announce_player_achievements = key('annouce_player_achievements')
+    level_type = key('level_type')
+    level_name = key('level_name')
+    generator_settings = key('generator_settings')
+    resource_pack = key('resource_pack')
+    resource_pack_sha1 = key('resource_pack_sha1')
+    view_distance = key('view_distance')
+    spawn_protection = key('spawn_protection')
+
+
+def _plugin_link(plugin: 'Plugin') -> Optional[str]:
+    try:
+        match = URL_REGEX.search(plugin.description_extended)
+        return match.groups()[0]
+    except (AttributeError, TypeError):
+        return None
 
 
 class Plugin(Model):
-    __slots__ = ('id', 'name')
+    _repr_attrs = ('id', 'name')
 
     def __init__(self, data: dict) -> None:
         self.data: dict = data
 
-        self.id = data.get('_id')
-        self.name = data.get('name')
-        self.credits = data.get('credits')
-        self.platform = data.get('platform')
-        self.description = data.get('desc')
-        self.description_extended = data.get('desc_extended')
-        self.version = data.get('version')
-        self.disabled = data.get('disabled')
-        self.file = data.get('file_name')
-        self.created = datetime.datetime.fromtimestamp(
-            (data.get('created'))/1000.0, tz=datetime.timezone.utc)
-        self.last_updated = datetime.datetime.fromtimestamp(
-            (data.get('last_updated'))/1000.0, tz=datetime.timezone.utc)
-        self.html_description_extended = data.get('html_desc_extended')
-
-        try:
-            match = re.search(URL_REGEX, self.description_extended)
-            self.link = match.groups()[0]
-        except AttributeError:
-            self.link = None
+    id = key('_id')
+    name = key('name')
+    credits = key('credits')
+    platform = key('platform')
+    description = key('desc')
+    description_extended = key('desc_extended')
+    version = key('version')
+    disabled = key('disabled')
+    file = key('file_name')
+    created = field(lambda self: timestamp(self.data.get('created')))
+    last_updated = field(lambda self: timestamp(self.data.get('last_updated')))
+    html_description_extended = key('html_desc_extended')
+    link = field(_plugin_link)
 
 
 class SimpleStats(Model):
-    __slots__ = ()
-
     def __init__(self, data: dict) -> None:
         self.data: dict = data
 
-        self.player_count = data.get('player_count')
-        self.server_count = data.get('server_count')
-        self.server_max = data.get('server_max')
-        self.ram_count = data.get('ram_count')
-        self.ram_max = data.get('ram_max')
+    player_count = key('player_count')
+    server_count = key('server_count')
+    server_max = key('server_max')
+    ram_count = key('ram_count')
+    ram_max = key('ram_max')
 
 
 class HomepageStats(Model):
-    __slots__ = ()
-
     def __init__(self, data: dict) -> None:
         self.data: dict = data
 
-        self.server_count = data.get('server_count')
-        self.user_count = data.get('user_count')
+    server_count = key('server_count')
+    user_count = key('user_count')
 
 
 class PlayerDistribution(Model):
-    __slots__ = ()
-
     def __init__(self, data: dict) -> None:
         self.data: dict = data
 
-        self.bedrock_total = data.get('bedrockTotal')
-        self.java_total = data.get('javaTotal')
-        self.bedrock_lobby = data.get('bedrockLobby')
-        self.bedrock_player_server = data.get('bedrockPlayerServer')
-        self.java_lobby = data.get('javaLobby')
-        self.java_player_server = data.get('javaPlayerServer')
+    bedrock_total = key('bedrockTotal')
+    java_total = key('javaTotal')
+    bedrock_lobby = key('bedrockLobby')
+    bedrock_player_server = key('bedrockPlayerServer')
+    java_lobby = key('javaLobby')
+    java_player_server = key('javaPlayerServer')
 
 
 class Server(Model):
-    __slots__ = ('id', 'name')
+    __slots__ = ('_http', '__weakref__')
+    _repr_attrs = ('id', 'name')
+    START_STEPS = ('start_service', 'start')
+    STOP_STEPS = ('destroy_service', 'shutdown')
 
     def __init__(self, http: HTTP, data: dict) -> None:
         self._http = http
         self.data: dict = data
 
-        self.server_properties = ServerProperties(
-            data.get('server_properties', {}))
-        self.categories = data.get('categories')
-        self.purchased_icons = data.get('purchased_icons')
-        self.backup_slots = data.get('backup_slots')
-        self.suspended = data.get('suspended')
-        self.installed_content_packs = data.get('installed_content_packs')
-        self.version_type = data.get('server_version_type')
-        self.id = data.get('_id')
-        self.motd = data.get('motd')
-        self.visibility = data.get('visibility')
-        self.storage_node = data.get('storage_node')
-        self.owner = data.get('owner')
-        self.name = data.get('name')
-        self.creation = datetime.datetime.fromtimestamp(
-            (data.get('creation'))/1000.0, tz=datetime.timezone.utc)
-        self.credits_per_day = data.get('credits_per_day')
-        self.last_online = datetime.datetime.fromtimestamp(
-            (data.get('last_online'))/1000.0, tz=datetime.timezone.utc)
-        self.icon = data.get('icon')
-        self.online = data.get('online')
-        self.max_players = data.get('max_players')
-        self.player_count = data.get('player_count')
-        self.plan = ServerPlan(data.get(
-            'rawPlan'), None)
+    server_properties = field(lambda self: ServerProperties(
+        self.data.get('server_properties', {})), 'server_properties')
+    categories = key('categories')
+    purchased_icons = key('purchased_icons')
+    backup_slots = key('backup_slots')
+    suspended = key('suspended')
+    installed_content_packs = key('installed_content_packs')
+    version_type = key('server_version_type')
+    id = key('_id')
+    motd = key('motd')
+    visibility = key('visibility')
+    storage_node = key('storage_node')
+    owner = key('owner')
+    name = key('name')
+    creation = field(lambda self: timestamp(self.data.get('creation')), 'creation')
+    credits_per_day = key('credits_per_day')
+    last_online = field(lambda self: timestamp(self.data.get('last_online')), 'last_online')
+    icon = key('icon')
+    online = key('online')
+    max_players = key('max_players')
+    player_count = key('player_count')
+    plan = field(lambda self: ServerPlan(self.data.get(
+        'rawPlan'), None), 'rawPlan')
+
+    async def refresh(self) -> List[str]:
+        """A method that refetches the server and updates it in place.
+
+        Returns the names of the fields that changed. The cache is bypassed,
+        so this always reflects the api as of the call."""
+        data = await self._http.get(f'/server/{self.id}', fresh=True)
+        if not data.get('ok', True):
+            raise ServerNotFound(
+                'Server with id "{}" was not found.'.format(self.id))
+        return self._update(data.get('server'))
 
     async def get_plugins(self) -> AsyncGenerator[Plugin, None]:
         """A method that yields the plugins of the server."""
@@ -211,8 +291,8 @@ class Server(Model):
     async def start(self) -> bool:
         """A method that starts the server. Requires authentication."""
         try:
-            await self._http.post(f'/server/{self.id}/start_service')
-            await self._http.post(f'/server/{self.id}/start')
+            for step in self.START_STEPS:
+                await self._http.post(f'/server/{self.id}/{step}')
             return True
         except APIError:
             return False
@@ -220,8 +300,8 @@ class Server(Model):
     async def stop(self) -> bool:
         """A method that starts the server. Requires authentication."""
         try:
-            await self._http.post(f'/server/{self.id}/destroy_service')
-            await self._http.post(f'/server/{self.id}/shutdown')
+            for step in self.STOP_STEPS:
+                await self._http.post(f'/server/{self.id}/{step}')
             return True
         except APIError:
             return False
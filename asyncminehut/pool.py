@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from aiohttp import BaseConnector, ClientSession, TraceConfig, TraceConnectionCreateEndParams, \
+        TraceConnectionReuseconnParams
+
+
+class PoolStats:
+    """Connection reuse counters and the current state of a connector."""
+    __slots__ = ('connector', 'created', 'reused')
+
+    def __init__(self, connector: Optional['BaseConnector'] = None) -> None:
+        self.connector = connector
+        self.created = 0
+        self.reused = 0
+
+    def trace_config(self) -> 'TraceConfig':
+        """A trace config that counts new and reused connections of a session."""
+        from aiohttp import TraceConfig
+        config = TraceConfig()
+        config.on_connection_create_end.append(self._on_create)
+        config.on_connection_reuseconn.append(self._on_reuse)
+        return config
+
+    async def _on_create(self, session: 'ClientSession', context: SimpleNamespace,
+                         params: 'TraceConnectionCreateEndParams') -> None:
+        self.created += 1
+
+    async def _on_reuse(self, session: 'ClientSession', context: SimpleNamespace,
+                        params: 'TraceConnectionReuseconnParams') -> None:
+        self.reused += 1
+
+    @property
+    def reuse_ratio(self) -> float:
+        """The share of requests that were sent on an existing connection."""
+        total = self.created + self.reused
+        return self.reused / total if total else 0.0
+
+    @property
+    def acquired(self) -> int:
+        """The connections currently serving a request.
+
+        Read from the connector's private ``_acquired`` set, which aiohttp 3.x
+        has kept; it is 0 if a release drops it."""
+        return len(getattr(self.connector, '_acquired', ()))
+
+    @property
+    def idle(self) -> int:
+        """The keep-alive connections waiting in the pool.
+
+        Read from the connector's private ``_conns`` mapping, like
+        ``acquired``; it is 0 if a release drops it."""
+        return sum(map(len, getattr(self.connector, '_conns', {}).values()))
+
+    def snapshot(self) -> dict:
+        return {
+            'limit': getattr(self.connector, 'limit', None),
+            'limit_per_host': getattr(self.connector, 'limit_per_host', None),
+            'acquired': self.acquired,
+            'idle': self.idle,
+            'created': self.created,
+            'reused': self.reused,
+            'reuse_ratio': self.reuse_ratio,
+        }
+
+    def __repr__(self) -> str:
+        value = ''.join(f' {key}={value!r}' for key, value in self.snapshot().items())
+        return f'<{self.__class__.__name__}{value}>'
+
+
+__all__ = (
+    "PoolStats"
+)
@@ -0,0 +1,101 @@
+import asyncio
+import datetime
+import random
+import time
+from typing import Mapping, Optional
+
+from .constants import RATE_LIMIT_MIN, READ_RATE, RETRY_BASE, RETRY_CAP, WRITE_RATE
+
+
+class TokenBucket:
+    """A token bucket whose rate adapts to the api.
+
+    Every success raises the rate by ``1 / rate`` up to ``max_rate`` (about one
+    request per second, per second) and every 429 halves it down to
+    ``min_rate``. A ``Retry-After`` blocks the bucket until it passes. With a
+    ``rate`` of ``None`` the bucket only honours ``Retry-After``."""
+    __slots__ = ('rate', 'burst', 'max_rate', 'min_rate', 'tokens', 'updated', 'blocked_until')
+
+    def __init__(self, rate: Optional[float], burst: float = None, max_rate: float = None,
+                 min_rate: float = RATE_LIMIT_MIN) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self.max_rate = max_rate if max_rate is not None else (rate or 0.0) * 4
+        self.min_rate = min_rate
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """A method that waits until a request may be sent."""
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            if self.rate is None:
+                return
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def succeeded(self) -> None:
+        if self.rate is not None and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        if self.rate is not None:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+        if retry_after is not None:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def __repr__(self) -> str:
+        return f'<TokenBucket rate={self.rate!r} tokens={self.tokens!r}>'
+
+
+class RateLimiter:
+    """Separate read (GET) and write (POST) budgets for one api client."""
+    __slots__ = ('read', 'write')
+
+    def __init__(self, read_rate: Optional[float] = READ_RATE, write_rate: Optional[float] = WRITE_RATE,
+                 read_burst: float = None, write_burst: float = None) -> None:
+        self.read = TokenBucket(read_rate, burst=read_burst)
+        self.write = TokenBucket(write_rate, burst=write_burst)
+
+    def bucket(self, method: str) -> TokenBucket:
+        return self.read if method == 'GET' else self.write
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Parses a ``Retry-After`` header given in seconds or as an http date."""
+    if (value := headers.get('Retry-After')) is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # Only needed for the rare date form, so it isn't imported with the package.
+    from email.utils import parsedate_to_datetime
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        # A -0000 zone parses as naive; it is still UTC.
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+def backoff(attempt: int, base: float = RETRY_BASE, cap: float = RETRY_CAP) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+__all__ = (
+    "TokenBucket",
+    "RateLimiter"
+)
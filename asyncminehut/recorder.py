@@ -0,0 +1,202 @@
+import asyncio
+import math
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from .constants import RECORDER_HOUR_CAPACITY, RECORDER_INTERVAL, RECORDER_MINUTE_CAPACITY, RECORDER_RAW_CAPACITY
+from .scheduler import BULK, priority
+
+SIMPLE_STATS = ('player_count', 'server_count', 'server_max', 'ram_count', 'ram_max')
+HOMEPAGE_STATS = ('server_count', 'user_count')
+PLAYER_DISTRIBUTION = ('bedrock_total', 'java_total', 'bedrock_lobby', 'bedrock_player_server', 'java_lobby',
+                       'java_player_server')
+
+
+class Ring:
+    """A fixed-size ring of float rows; column 0 is the timestamp."""
+    __slots__ = ('capacity', 'columns', 'head', 'size')
+
+    def __init__(self, capacity: int, width: int) -> None:
+        self.capacity = capacity
+        self.columns: List[array] = [array('d', bytes(8 * capacity)) for _ in range(width)]
+        self.head = 0
+        self.size = 0
+
+    def append(self, *row: float) -> None:
+        for column, value in zip(self.columns, row):
+            column[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def _slot(self, position: int) -> int:
+        # Position 0 is the oldest row.
+        return (self.head - self.size + position) % self.capacity
+
+    @property
+    def oldest(self) -> Optional[float]:
+        return self.columns[0][self._slot(0)] if self.size else None
+
+    def _bisect(self, when: float) -> int:
+        times, low, high = self.columns[0], 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if times[self._slot(middle)] < when:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def select(self, start: float, end: float, column: int = 1) -> List[Tuple[float, float]]:
+        """The ``(timestamp, value)`` rows with ``start <= timestamp < end``."""
+        times, values = self.columns[0], self.columns[column]
+        slots = map(self._slot, range(self._bisect(start), self._bisect(end)))
+        return [(times[slot], values[slot]) for slot in slots]
+
+
+class Rollup:
+    """Aggregates samples into fixed-width buckets of mean, min and max."""
+    __slots__ = ('width', 'ring', 'bucket', 'total', 'count', 'low', 'high')
+
+    def __init__(self, width: float, capacity: int) -> None:
+        self.width = width
+        self.ring = Ring(capacity, 4)
+        self.bucket: Optional[float] = None
+        self.total = self.count = 0.0
+        self.low, self.high = math.inf, -math.inf
+
+    def add(self, when: float, value: float) -> None:
+        bucket = when - when % self.width
+        if bucket != self.bucket:
+            self.flush()
+            self.bucket = bucket
+        self.total += value
+        self.count += 1
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+
+    def flush(self) -> None:
+        if self.count:
+            self.ring.append(self.bucket, self.total / self.count, self.low, self.high)
+        self.total = self.count = 0.0
+        self.low, self.high = math.inf, -math.inf
+
+
+class Series:
+    """One metric: raw samples, then 1-minute and 1-hour rollups, all in fixed rings."""
+    __slots__ = ('raw', 'minutes', 'hours')
+
+    def __init__(self, raw_capacity: int = RECORDER_RAW_CAPACITY, minute_capacity: int = RECORDER_MINUTE_CAPACITY,
+                 hour_capacity: int = RECORDER_HOUR_CAPACITY) -> None:
+        self.raw = Ring(raw_capacity, 2)
+        self.minutes = Rollup(60.0, minute_capacity)
+        self.hours = Rollup(3600.0, hour_capacity)
+
+    def append(self, when: float, value: float) -> None:
+        self.raw.append(when, value)
+        self.minutes.add(when, value)
+        self.hours.add(when, value)
+
+    def range(self, start: float = 0.0, end: float = math.inf) -> List[Tuple[float, float]]:
+        """The samples in ``[start, end)``, oldest first, stitched from the tiers.
+
+        Raw samples cover as far back as they go; before that the minute and
+        then the hour rollups fill in with their bucket means, using only the
+        buckets that end before the finer tier begins."""
+        samples: List[Tuple[float, float]] = []
+        cutoff = end
+        for width, ring in ((0.0, self.raw), (self.minutes.width, self.minutes.ring),
+                            (self.hours.width, self.hours.ring)):
+            if cutoff <= start:
+                break
+            if not ring.size:
+                continue
+            if width and cutoff < math.inf:
+                cutoff -= cutoff % width
+            samples[:0] = ring.select(start, cutoff)
+            cutoff = min(cutoff, ring.oldest)
+        return samples
+
+    def rate(self, start: float = 0.0, end: float = math.inf) -> Optional[float]:
+        """The average change per second over the range."""
+        samples = self.range(start, end)
+        if len(samples) < 2 or samples[-1][0] == samples[0][0]:
+            return None
+        return (samples[-1][1] - samples[0][1]) / (samples[-1][0] - samples[0][0])
+
+    def percentile(self, q: float, start: float = 0.0, end: float = math.inf) -> Optional[float]:
+        """The ``q``-th percentile (0-100) of the range, interpolated linearly.
+
+        Exact while the raw samples cover the range; older parts only count
+        their rollup means, which makes the result an approximation."""
+        values = sorted(value for _, value in self.range(start, end))
+        if not values:
+            return None
+        rank = (len(values) - 1) * q / 100
+        low = math.floor(rank)
+        high = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+class StatsRecorder:
+    """Samples the network stats on a schedule into one ``Series`` per metric.
+
+    Metrics are named ``simple.<field>``, ``homepage.<field>`` and
+    ``distribution.<field>`` after the model attributes. Memory is allocated
+    up front and stays constant however long the recorder runs."""
+
+    def __init__(self, client, interval: float = RECORDER_INTERVAL, raw_capacity: int = RECORDER_RAW_CAPACITY,
+                 minute_capacity: int = RECORDER_MINUTE_CAPACITY, hour_capacity: int = RECORDER_HOUR_CAPACITY) -> None:
+        self._client = client
+        self.interval = interval
+        self.series: Dict[str, Series] = {
+            '{}.{}'.format(prefix, name): Series(raw_capacity, minute_capacity, hour_capacity)
+            for prefix, names in (('simple', SIMPLE_STATS), ('homepage', HOMEPAGE_STATS),
+                                  ('distribution', PLAYER_DISTRIBUTION))
+            for name in names
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    def __getitem__(self, name: str) -> Series:
+        return self.series[name]
+
+    async def sample(self) -> None:
+        """A method that polls the stats endpoints once and records the values."""
+        simple, homepage, distribution = await asyncio.gather(
+            self._client.get_simple_stats(), self._client.get_homepage_stats(),
+            self._client.get_player_distribution())
+        when = time.time()
+        for prefix, model, names in (('simple', simple, SIMPLE_STATS), ('homepage', homepage, HOMEPAGE_STATS),
+                                     ('distribution', distribution, PLAYER_DISTRIBUTION)):
+            for name in names:
+                if (value := getattr(model, name)) is not None:
+                    self.series['{}.{}'.format(prefix, name)].append(when, value)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            started = loop.time()
+            try:
+                with priority(BULK):
+                    await self.sample()
+            except Exception:
+                # A failed poll is a gap in the series, not the end of recording.
+                pass
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    def start(self) -> None:
+        """A method that starts polling in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        """A method that stops polling."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+__all__ = (
+    "Series",
+    "StatsRecorder"
+)
@@ -0,0 +1,172 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+from .constants import POOL_LIMIT_PER_HOST, SCHEDULER_MAX_WAIT, SCHEDULER_RESERVED
+from .metrics import Histogram
+
+CONTROL = 'control'
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+PRIORITIES = (CONTROL, INTERACTIVE, BULK)
+
+_current: ContextVar[Optional[str]] = ContextVar('priority', default=None)
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """Runs the requests made in the block at a priority, unless they name one.
+
+    The priority belongs to the current task and is inherited by tasks it
+    creates; don't hold it across a ``yield`` of an async generator, where it
+    would leak into the consumer."""
+    if name not in PRIORITIES:
+        raise ValueError(f'unknown priority {name!r}')
+    token = _current.set(name)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class PriorityStats:
+    """Queueing counters of one priority class."""
+    __slots__ = ('requests', 'queued', 'max_queued', 'promoted', 'wait')
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.promoted = 0
+        self.wait = Histogram()
+
+    def snapshot(self) -> dict:
+        return {
+            'requests': self.requests,
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'promoted': self.promoted,
+            'wait': self.wait.snapshot(),
+        }
+
+
+class RequestScheduler:
+    """Orders requests by priority under one concurrency budget.
+
+    ``control`` requests (writes by default) may use every slot, while
+    ``interactive`` (reads by default) and ``bulk`` leave ``reserved`` slots
+    free for them, so a server action never waits behind a saturated sync.
+    Freed slots go to the highest waiting class, except that a waiter queued
+    for ``max_wait`` seconds or more goes first regardless of class. With a
+    ``concurrency`` of ``None`` or 0, as with aiohttp's connection limits,
+    requests are only counted; a budget too small to spare ``reserved`` slots
+    reserves as many as it can while keeping one for every class."""
+
+    def __init__(self, concurrency: Optional[int] = POOL_LIMIT_PER_HOST, reserved: int = SCHEDULER_RESERVED,
+                 max_wait: float = SCHEDULER_MAX_WAIT) -> None:
+        if reserved < 0:
+            raise ValueError('reserved must not be negative')
+        if not concurrency:
+            concurrency = None
+        else:
+            reserved = min(reserved, concurrency - 1)
+        self.concurrency = concurrency
+        self.reserved = reserved
+        self.max_wait = max_wait
+        self.active = 0
+        self.stats: Dict[str, PriorityStats] = {name: PriorityStats() for name in PRIORITIES}
+        self._queues: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {name: deque() for name in PRIORITIES}
+
+    @staticmethod
+    def resolve(method: str, name: Optional[str] = None) -> str:
+        """The priority of a request: the one given, else the one set by
+        ``priority()``, else control for writes and interactive for reads."""
+        if name is None:
+            name = _current.get()
+        if name is None:
+            return INTERACTIVE if method == 'GET' else CONTROL
+        if name not in PRIORITIES:
+            raise ValueError(f'unknown priority {name!r}')
+        return name
+
+    def _limit(self, name: str) -> int:
+        return self.concurrency if name == CONTROL else self.concurrency - self.reserved
+
+    async def acquire(self, name: str) -> None:
+        """A method that waits for a slot for a request of the given priority."""
+        stats = self.stats[name]
+        stats.requests += 1
+        if self.concurrency is None:
+            self.active += 1
+            return
+        rank = PRIORITIES.index(name)
+        if self.active < self._limit(name) and not any(self._queues[other] for other in PRIORITIES[:rank + 1]):
+            self.active += 1
+            stats.wait.add(0.0)
+            return
+
+        since = time.monotonic()
+        waiter = asyncio.get_event_loop().create_future()
+        queue = self._queues[name]
+        queue.append((since, waiter))
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as it was cancelled, so hand the slot on.
+                self.release()
+            else:
+                try:
+                    queue.remove((since, waiter))
+                except ValueError:
+                    pass
+                else:
+                    stats.queued -= 1
+            raise
+        stats.wait.add(time.monotonic() - since)
+
+    def release(self) -> None:
+        """A method that frees a slot and hands it to the next waiter."""
+        self.active -= 1
+        if self.concurrency is None:
+            return
+        while (name := self._next()) is not None:
+            _, waiter = self._queues[name].popleft()
+            self.stats[name].queued -= 1
+            if waiter.done():
+                continue
+            self.active += 1
+            waiter.set_result(None)
+
+    def _next(self) -> Optional[str]:
+        heads = [(queue[0][0], name) for name, queue in self._queues.items()
+                 if queue and self.active < self._limit(name)]
+        if not heads:
+            return None
+        oldest, name = min(heads)
+        if time.monotonic() - oldest >= self.max_wait and name != heads[0][1]:
+            self.stats[name].promoted += 1
+            return name
+        # The queues are in priority order, so the first head is the most urgent.
+        return heads[0][1]
+
+    def snapshot(self) -> dict:
+        """A method that gets the active requests and the counters of every class."""
+        return {
+            'active': self.active,
+            'priorities': {name: stats.snapshot() for name, stats in self.stats.items()},
+        }
+
+
+__all__ = (
+    "CONTROL",
+    "INTERACTIVE",
+    "BULK",
+    "priority",
+    "RequestScheduler"
+)
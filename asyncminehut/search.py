@@ -0,0 +1,87 @@
+import heapq
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_REGEX = re.compile(r'[a-z0-9]+')
+
+# How much an occurrence in each field counts towards a term's frequency.
+FIELD_WEIGHTS: Dict[str, float] = {
+    'name': 3.0,
+    'credits': 2.0,
+    'desc': 1.5,
+    'desc_extended': 1.0,
+}
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase alphanumeric terms."""
+    return TOKEN_REGEX.findall(text.lower())
+
+
+class PluginIndex:
+    """An inverted index over the plugin catalog ranked with BM25.
+
+    Term frequencies are weighted per field (BM25F), so a match in a name
+    outranks one in an extended description. Every posting stores its final
+    score contribution, computed when the index is built, so a query only
+    sums the postings of its terms."""
+
+    def __init__(self, plugins: List[dict], weights: Dict[str, float] = None) -> None:
+        weights = FIELD_WEIGHTS if weights is None else weights
+        self._plugins = plugins
+        self._platforms: List[Optional[str]] = [plugin.get('platform') for plugin in plugins]
+        self._disabled: List[bool] = [bool(plugin.get('disabled')) for plugin in plugins]
+
+        frequencies: List[Dict[str, float]] = []
+        lengths: List[float] = []
+        for plugin in plugins:
+            terms: Dict[str, float] = {}
+            length = 0.0
+            for name, weight in weights.items():
+                for term in tokenize(plugin.get(name) or ''):
+                    terms[term] = terms.get(term, 0.0) + weight
+                    length += weight
+            frequencies.append(terms)
+            lengths.append(length)
+
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for document, terms in enumerate(frequencies):
+            for term, frequency in terms.items():
+                postings.setdefault(term, []).append((document, frequency))
+
+        count = len(plugins)
+        average = sum(lengths) / count if count else 0.0
+        norms = [K1 * (1 - B + B * length / average) if average else K1 for length in lengths]
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for term, entries in postings.items():
+            idf = math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._postings[term] = [(document, idf * frequency * (K1 + 1) / (frequency + norms[document]))
+                                    for document, frequency in entries]
+
+    def __len__(self) -> int:
+        return len(self._plugins)
+
+    def search(self, query: str, platform: str = None, disabled: Optional[bool] = False,
+               limit: int = 10) -> List[Tuple[dict, float]]:
+        """A method that ranks plugins against a keyword query.
+
+        Results are ``(raw plugin, score)`` pairs, best first. Any term may
+        match. ``platform`` keeps one platform only; ``disabled`` keeps only
+        disabled (``True``) or enabled (``False``) plugins, or both (``None``)."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            for document, impact in self._postings.get(term, ()):
+                scores[document] = scores.get(document, 0.0) + impact
+        platforms, disableds = self._platforms, self._disabled
+        matches = ((score, document) for document, score in scores.items()
+                   if (platform is None or platforms[document] == platform)
+                   and (disabled is None or disableds[document] == disabled))
+        return [(self._plugins[document], score) for score, document in heapq.nlargest(limit, matches)]
+
+
+__all__ = (
+    "PluginIndex"
+)
@@ -0,0 +1,215 @@
+import heapq
+import json
+from array import array
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Union
+
+from .decoders import Decoder
+from .models import PartialServer
+
+NUMERIC_COLUMNS = ('player_count', 'max_players', 'service_start_date')
+ENCODED_COLUMNS = ('plan', 'visibility')
+
+
+class Dictionary:
+    """A dictionary-encoded column: each row stores a small code into ``values``."""
+    __slots__ = ('values', 'index', 'codes')
+
+    def __init__(self, values: List[Hashable] = None, codes: array = None) -> None:
+        self.values: List[Hashable] = values if values is not None else []
+        self.index: Dict[Hashable, int] = {value: code for code, value in enumerate(self.values)}
+        self.codes: array = codes if codes is not None else array('H')
+
+    def append(self, value: Hashable) -> None:
+        if (code := self.index.get(value)) is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def take(self, rows: Iterable[int]) -> 'Dictionary':
+        codes = self.codes
+        return Dictionary(self.values, array('H', [codes[row] for row in rows]))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> Hashable:
+        return self.values[self.codes[row]]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        values = self.values
+        return (values[code] for code in self.codes)
+
+
+class ServerSnapshot:
+    """A columnar copy of the server listing.
+
+    ``player_count``, ``max_players`` and ``service_start_date`` (epoch
+    milliseconds) are typed arrays; ``plan`` and ``visibility`` are
+    dictionary-encoded. Every operation returns a new snapshot over the
+    selected rows, and ``server(row)`` rebuilds a ``PartialServer`` only when
+    one is needed."""
+    __slots__ = ('ids', 'names', 'player_count', 'max_players', 'service_start_date', 'plan', 'visibility', 'loads',
+                 '_rows')
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.player_count: array = array('l')
+        self.max_players: array = array('l')
+        self.service_start_date: array = array('q')
+        self.plan: Dictionary = Dictionary()
+        self.visibility: Dictionary = Dictionary()
+        # Raw entries, or their json bytes when the snapshot was built in a worker process.
+        self._rows: List[Union[dict, bytes]] = []
+        # Decodes the rows kept as json bytes; the client sets its own decoder.
+        self.loads: Decoder = json.loads
+
+    @classmethod
+    def from_servers(cls, servers: Iterable[dict]) -> 'ServerSnapshot':
+        """Builds a snapshot from the raw entries of the /servers listing."""
+        snapshot = cls()
+        for server in servers:
+            snapshot.append(server)
+        return snapshot
+
+    def append(self, server: dict) -> None:
+        """A method that adds a raw server entry as a new row."""
+        static = server.get('staticInfo', {})
+        self.ids.append(static.get('_id'))
+        self.names.append(server.get('name'))
+        self.player_count.append(server.get('playerData', {}).get('playerCount') or 0)
+        self.max_players.append(server.get('maxPlayers') or 0)
+        self.service_start_date.append(static.get('serviceStartDate') or 0)
+        self.plan.append(static.get('rawPlan'))
+        self.visibility.append(server.get('visibility'))
+        self._rows.append(server)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[PartialServer]:
+        return map(self._model, self._rows)
+
+    def __repr__(self) -> str:
+        return f'<ServerSnapshot rows={len(self)}>'
+
+    def server(self, row: int) -> PartialServer:
+        """A method that materializes a single row."""
+        return self._model(self._rows[row])
+
+    def _model(self, row: Union[dict, bytes]) -> PartialServer:
+        return PartialServer(self.loads(row) if isinstance(row, bytes) else row)
+
+    def column(self, name: str) -> Sequence:
+        """A method that gets a column by name."""
+        if name not in NUMERIC_COLUMNS + ENCODED_COLUMNS + ('ids', 'names'):
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def take(self, rows: Iterable[int]) -> 'ServerSnapshot':
+        """A method that builds a snapshot of the given row positions, in order."""
+        rows = list(rows)
+        snapshot = ServerSnapshot.__new__(ServerSnapshot)
+        for name in ('ids', 'names', '_rows'):
+            values = getattr(self, name)
+            setattr(snapshot, name, [values[row] for row in rows])
+        for name in NUMERIC_COLUMNS:
+            values = getattr(self, name)
+            setattr(snapshot, name, array(values.typecode, [values[row] for row in rows]))
+        snapshot.plan = self.plan.take(rows)
+        snapshot.visibility = self.visibility.take(rows)
+        snapshot.loads = self.loads
+        return snapshot
+
+    def filter(self, mask: Iterable[bool] = None, **equals: Any) -> 'ServerSnapshot':
+        """A method that keeps the rows where ``mask`` is true and every encoded
+        column matches, e.g. ``filter(plan='MH20', visibility=True)``."""
+        rows: Iterable[int] = range(len(self))
+        if mask is not None:
+            rows = [row for row, keep in zip(rows, mask) if keep]
+        for name, value in equals.items():
+            if name not in ENCODED_COLUMNS:
+                raise KeyError(name)
+            encoded: Dictionary = getattr(self, name)
+            if (code := encoded.index.get(value)) is None:
+                return self.take(())
+            codes = encoded.codes
+            rows = [row for row in rows if codes[row] == code]
+        return self.take(rows)
+
+    def _sort_key(self, by: str) -> Callable[[int], Any]:
+        # Missing values sort before every other value of the column.
+        column = self.column(by)
+        if by in NUMERIC_COLUMNS:
+            return column.__getitem__
+        if isinstance(column, Dictionary):
+            # Each distinct value is ranked once and rows are compared by the rank of their code.
+            rank = [0] * len(column.values)
+            for position, code in enumerate(sorted(range(len(column.values)),
+                                                   key=lambda code: _missing_first(column.values[code]))):
+                rank[code] = position
+            codes = column.codes
+            return lambda row: rank[codes[row]]
+        return lambda row: _missing_first(column[row])
+
+    def _encoded(self, by: str) -> Dictionary:
+        if by not in ENCODED_COLUMNS:
+            raise KeyError(by)
+        return getattr(self, by)
+
+    def sort(self, by: str, reverse: bool = False) -> 'ServerSnapshot':
+        """A method that sorts the rows by a column. Missing values sort first."""
+        return self.take(sorted(range(len(self)), key=self._sort_key(by), reverse=reverse))
+
+    def top(self, by: str, k: int) -> 'ServerSnapshot':
+        """A method that keeps the ``k`` rows with the largest values of a column."""
+        return self.take(heapq.nlargest(k, range(len(self)), key=self._sort_key(by)))
+
+    def group_by(self, by: str) -> Dict[Hashable, 'ServerSnapshot']:
+        """A method that splits the rows by the value of an encoded column."""
+        encoded = self._encoded(by)
+        groups: List[List[int]] = [[] for _ in encoded.values]
+        for row, code in enumerate(encoded.codes):
+            groups[code].append(row)
+        return {encoded.values[code]: self.take(rows) for code, rows in enumerate(groups) if rows}
+
+    def aggregate(self, by: str, column: str = 'player_count',
+                  func: Callable[[array], Any] = sum) -> Dict[Hashable, Any]:
+        """A method that reduces a numeric column per value of an encoded column."""
+        encoded = self._encoded(by)
+        if column not in NUMERIC_COLUMNS:
+            raise KeyError(column)
+        values = self.column(column)
+        groups = [array(values.typecode) for _ in encoded.values]
+        for code, value in zip(encoded.codes, values):
+            groups[code].append(value)
+        return {encoded.values[code]: func(group) for code, group in enumerate(groups) if group}
+
+    def count_by(self, by: str) -> Dict[Hashable, int]:
+        """A method that counts the rows per value of an encoded column."""
+        encoded = self._encoded(by)
+        counts = [0] * len(encoded.values)
+        for code in encoded.codes:
+            counts[code] += 1
+        return {encoded.values[code]: count for code, count in enumerate(counts) if count}
+
+
+def _missing_first(value: Any) -> tuple:
+    return value is not None, value
+
+
+def decode_snapshot(loads: Decoder, body: bytes, compact: bool = False) -> ServerSnapshot:
+    """Decodes a /servers body straight into a snapshot.
+
+    With ``compact`` the raw rows are kept as json bytes, which pickle back from
+    a worker process far faster than nested dicts; they are decoded again only
+    when a row is materialized."""
+    snapshot = ServerSnapshot.from_servers(loads(body).get('servers'))
+    if compact:
+        snapshot._rows = [json.dumps(row, separators=(',', ':')).encode() for row in snapshot._rows]
+    return snapshot
+
+
+__all__ = (
+    "ServerSnapshot"
+)
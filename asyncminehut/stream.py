@@ -0,0 +1,112 @@
+import codecs
+import json
+from typing import Any, AsyncGenerator, AsyncIterable
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER = '0123456789.eE+-'
+
+
+class _Buffer:
+    """Text decoded so far from a byte stream, consumed from the front."""
+    __slots__ = ('chunks', 'utf8', 'text', 'pos', 'eof')
+
+    def __init__(self, chunks: AsyncIterable[bytes]) -> None:
+        self.chunks = chunks.__aiter__()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    async def fill(self) -> None:
+        """Appends the next chunk, raising ``ValueError`` if the stream ended."""
+        if self.eof:
+            raise ValueError('Unexpected end of JSON stream.')
+        try:
+            chunk = await self.chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            chunk = b''
+        # Drop what was already consumed so the buffer stays around one chunk.
+        self.text = self.text[self.pos:] + self.utf8.decode(chunk, final=self.eof)
+        self.pos = 0
+
+    def skip(self) -> None:
+        text, pos = self.text, self.pos
+        while pos < len(text) and text[pos] in _WHITESPACE:
+            pos += 1
+        self.pos = pos
+
+    async def peek(self) -> str:
+        """Returns the next non-whitespace character without consuming it."""
+        self.skip()
+        while self.pos >= len(self.text):
+            await self.fill()
+            self.skip()
+        return self.text[self.pos]
+
+    async def expect(self, char: str) -> None:
+        if (found := await self.peek()) != char:
+            raise ValueError('Expected {!r} in JSON stream, found {!r}.'.format(char, found))
+        self.pos += 1
+
+    async def value(self) -> Any:
+        """Decodes the next complete JSON value."""
+        await self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                # Either malformed or cut off at the chunk boundary; only the
+                # end of the stream tells them apart.
+                if self.eof:
+                    raise
+            else:
+                # A number cut off by the chunk boundary, e.g. ``4.`` of
+                # ``4.5``, decodes early; it is only complete when something
+                # other than a number character follows it.
+                tail = end
+                while tail < len(self.text) and self.text[tail] in _NUMBER:
+                    tail += 1
+                if self.eof or tail < len(self.text) or not isinstance(value, (int, float)) \
+                        or isinstance(value, bool):
+                    self.pos = end
+                    return value
+            await self.fill()
+
+
+async def iter_array(chunks: AsyncIterable[bytes], key: str) -> AsyncGenerator[Any, None]:
+    """Yields the items of the array under ``key`` of a top-level JSON object
+    as soon as each one is complete, reading the body chunk by chunk."""
+    buffer = _Buffer(chunks)
+    try:
+        await buffer.expect('{')
+        if await buffer.peek() == '}':
+            return
+        while True:
+            name = await buffer.value()
+            await buffer.expect(':')
+            if name == key:
+                break
+            await buffer.value()
+            if await buffer.peek() == '}':
+                return
+            await buffer.expect(',')
+
+        await buffer.expect('[')
+        if await buffer.peek() == ']':
+            return
+        while True:
+            yield await buffer.value()
+            if await buffer.peek() == ']':
+                return
+            await buffer.expect(',')
+    finally:
+        # Release the underlying response even when the caller stops early.
+        if hasattr(buffer.chunks, 'aclose'):
+            await buffer.chunks.aclose()
+
+
+__all__ = (
+    "iter_array"
+)
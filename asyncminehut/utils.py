@@ -1,5 +1,5 @@
 from .errors import InvalidCredential
-from typing import Any, List
+from typing import Any, List, Mapping
 from uuid import UUID
 
 
@@ -11,6 +11,21 @@ def get(__list: List[dict], key: str, value: Any) -> dict:
     return False
 
 
+def request_key(route: str, params: Mapping[str, Any] = None) -> str:
+    """Builds a key that identifies a GET request by its route and query parameters."""
+    if not params:
+        return route
+    return '{}#{}'.format(route, '&'.join('{}={}'.format(*item) for item in sorted(params.items())))
+
+
+def route_template(route: str) -> str:
+    """Replaces the server id or name of a route with ``{id}`` and drops the query."""
+    parts = route.split('?', 1)[0].split('/')
+    if len(parts) > 2 and parts[1] == 'server':
+        parts[2] = '{id}'
+    return '/'.join(parts)
+
+
 def is_valid_uuid(uuid: str) -> UUID:
     try:
         return UUID(uuid, version=4)
@@ -20,5 +35,7 @@ def is_valid_uuid(uuid: str) -> UUID:
 
 __all__ = (
     "get",
+    "request_key",
+    "route_template",
     "is_valid_uuid"
 )
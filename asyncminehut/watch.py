@@ -0,0 +1,100 @@
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type
+
+from .models import PartialServer
+
+
+class ServerEvent:
+    """A change to one server between two polls of the listing."""
+    __slots__ = ('server', 'before', 'after')
+
+    def __init__(self, server: PartialServer, before: Any = None, after: Any = None) -> None:
+        self.server = server
+        self.before = before
+        self.after = after
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} server={self.server!r} before={self.before!r} after={self.after!r}>'
+
+
+class ServerOnline(ServerEvent):
+    """The server appeared in the listing."""
+    __slots__ = ()
+
+
+class ServerOffline(ServerEvent):
+    """The server left the listing; ``server`` is its last known state."""
+    __slots__ = ()
+
+
+class PlayerCountChanged(ServerEvent):
+    __slots__ = ()
+
+
+class MotdChanged(ServerEvent):
+    __slots__ = ()
+
+
+class PlanChanged(ServerEvent):
+    __slots__ = ()
+
+
+FIELD_EVENTS: Dict[Type[ServerEvent], Callable[[dict], Any]] = {
+    PlayerCountChanged: lambda server: server.get('playerData', {}).get('playerCount'),
+    MotdChanged: lambda server: server.get('motd'),
+    PlanChanged: lambda server: server.get('staticInfo', {}).get('rawPlan'),
+}
+ALL_EVENTS = (ServerOnline, ServerOffline) + tuple(FIELD_EVENTS)
+
+
+class ServerWatcher:
+    """Diffs successive server listings against an id-keyed index of the last one.
+
+    Only the fields of the subscribed events are extracted, into one tuple per
+    server, so an unchanged server costs a single tuple comparison."""
+
+    def __init__(self, events: Iterable[Type[ServerEvent]] = ALL_EVENTS) -> None:
+        events = tuple(events)
+        self.online = ServerOnline in events
+        self.offline = ServerOffline in events
+        self._fields: Tuple[Tuple[Type[ServerEvent], Callable[[dict], Any]], ...] = tuple(
+            (event, extract) for event, extract in FIELD_EVENTS.items() if event in events)
+        self._index: Dict[str, Tuple[dict, tuple]] = {}
+        self.primed = False
+
+    def _key(self, server: dict) -> tuple:
+        return tuple(extract(server) for _, extract in self._fields)
+
+    def update(self, servers: Iterable[dict]) -> List[ServerEvent]:
+        """A method that indexes a new listing and returns what changed since the last one.
+
+        The first listing only primes the index."""
+        previous, index = self._index, {}
+        events: List[ServerEvent] = []
+        for server in servers:
+            server_id = server.get('staticInfo', {}).get('_id')
+            key = self._key(server)
+            index[server_id] = server, key
+            if (old := previous.pop(server_id, None)) is None:
+                if self.primed and self.online:
+                    events.append(ServerOnline(PartialServer(server)))
+            elif old[1] != key:
+                model = PartialServer(server)
+                for (event, _), before, after in zip(self._fields, old[1], key):
+                    if before != after:
+                        events.append(event(model, before, after))
+        if self.primed and self.offline:
+            events.extend(ServerOffline(PartialServer(server)) for server, _ in previous.values())
+        self._index = index
+        self.primed = True
+        return events
+
+
+__all__ = (
+    "ServerEvent",
+    "ServerOnline",
+    "ServerOffline",
+    "PlayerCountChanged",
+    "MotdChanged",
+    "PlanChanged",
+    "ServerWatcher"
+)
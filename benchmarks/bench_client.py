@@ -0,0 +1,141 @@
+"""Throughput, latency and memory of each client API against the local mock.
+
+    python -m benchmarks.bench_client [--servers N] [--plugins N] [--iterations N] [--concurrency N]
+                                      [--latency S] [--error-rate P] [--retries N]
+                                      [--coalesce] [--only NAME ...]
+
+Per API this prints calls/s, decoded items/s, p50/p99 latency and the peak
+traced memory of a single call.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict, List
+
+from asyncminehut import Client, RateLimiter, Server
+
+from . import mock
+
+Call = Callable[[Client, int], Awaitable[int]]
+
+
+async def _count(generator) -> int:
+    count = 0
+    async for _ in generator:
+        count += 1
+    return count
+
+
+def apis(servers: int, names: List[str], plugins: List[str]) -> Dict[str, Call]:
+    async def server_by_name(client: Client, i: int) -> int:
+        await client.get_server_by_name(names[i % len(names)])
+        return 1
+
+    async def send_command(client: Client, i: int) -> int:
+        await Server(client._http, {'_id': '%024x' % (i % servers)}).send_command('say hi')
+        return 1
+
+    return {
+        'get_all_servers': lambda client, i: _count(client.get_all_servers()),
+        'get_all_servers(stream)': lambda client, i: _count(client.get_all_servers(stream=True)),
+        'get_servers_snapshot': lambda client, i: _len(client.get_servers_snapshot()),
+        'get_server_by_id': lambda client, i: _one(client.get_server_by_id('%024x' % (i % servers))),
+        'get_server_by_name': server_by_name,
+        'get_all_plugins': lambda client, i: _count(client.get_all_plugins()),
+        'get_plugin_by_name': lambda client, i: _one(client.get_plugin_by_name(plugins[i % len(plugins)])),
+        'get_simple_stats': lambda client, i: _one(client.get_simple_stats()),
+        'get_homepage_stats': lambda client, i: _one(client.get_homepage_stats()),
+        'get_player_distribution': lambda client, i: _one(client.get_player_distribution()),
+        'Server.send_command': send_command,
+    }
+
+
+async def _len(awaitable) -> int:
+    return len(await awaitable)
+
+
+async def _one(awaitable) -> int:
+    await awaitable
+    return 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round((len(values) - 1) * q / 100)))]
+
+
+async def measure(client: Client, call: Call, iterations: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    items = 0
+    counter = iter(range(iterations))
+
+    async def worker() -> None:
+        nonlocal items
+        for i in counter:
+            start = time.perf_counter()
+            count = await call(client, i)
+            items += count
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    await call(client, 0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'calls/s': iterations / elapsed,
+        'items/s': items / elapsed,
+        'p50 ms': statistics.median(latencies) * 1e3,
+        'p99 ms': percentile(latencies, 99) * 1e3,
+        'peak KiB': peak / 1024,
+    }
+
+
+async def run(args: argparse.Namespace, base_url: str) -> None:
+    # Coalescing would fold concurrent identical calls into one and hide the per-call cost.
+    client = Client(base_url=base_url, rate_limiter=RateLimiter(read_rate=None, write_rate=None),
+                    retries=args.retries,
+                    coalesce=args.coalesce)
+    try:
+        print('{:<26} {:>10} {:>12} {:>9} {:>9} {:>10}'.format(
+            'api', 'calls/s', 'items/s', 'p50 ms', 'p99 ms', 'peak KiB'))
+        names = (await client.get_servers_snapshot()).names
+        plugins = [plugin.name async for plugin in client.get_all_plugins()]
+        for name, call in apis(args.servers, names, plugins).items():
+            if args.only and name not in args.only:
+                continue
+            result = await measure(client, call, args.iterations, args.concurrency)
+            print('{:<26} {:>10.1f} {:>12.0f} {:>9.2f} {:>9.2f} {:>10.0f}'.format(name, *result.values()))
+    finally:
+        await client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--servers', type=int, default=10000)
+    parser.add_argument('--plugins', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--coalesce', action='store_true')
+    parser.add_argument('--only', nargs='*')
+    args = parser.parse_args()
+
+    process, base_url = mock.spawn(servers=args.servers, plugins=args.plugins, latency=args.latency,
+                                   error_rate=args.error_rate)
+    try:
+        asyncio.run(run(args, base_url))
+    finally:
+        process.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Cold-start cost of importing the package and creating a client, each
+measured in a fresh interpreter.
+
+    python -m benchmarks.bench_import [--runs N] [--top N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+SCENARIOS = (
+    ('import asyncminehut', 'import asyncminehut'),
+    ('from asyncminehut import Client', 'from asyncminehut import Client'),
+    ('Client()', 'from asyncminehut import Client; Client()'),
+    ('import aiohttp', 'import aiohttp'),
+)
+
+# Times the statement inside the child, then reports whether aiohttp got loaded.
+TIMER = '''
+import sys, time
+start = time.perf_counter()
+{}
+elapsed = time.perf_counter() - start
+print(elapsed, 'aiohttp' in sys.modules)
+'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(statement: str) -> Tuple[float, bool]:
+    output = subprocess.run([sys.executable, '-c', TIMER.format(statement)], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout.split()
+    return float(output[0]), output[1] == 'True'
+
+
+def slowest(statement: str, top: int) -> List[Tuple[int, str]]:
+    """The modules with the largest cumulative import time, in microseconds."""
+    lines = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT, check=True,
+                           capture_output=True, text=True).stderr.splitlines()
+    modules = []
+    for line in lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative), name.rstrip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=0, help='also list the slowest imports of Client()')
+    args = parser.parse_args()
+
+    print('{:<34} {:>9} {:>9} {:>8}'.format('scenario', 'min ms', 'p50 ms', 'aiohttp'))
+    for label, statement in SCENARIOS:
+        times, loaded = [], False
+        for _ in range(args.runs):
+            elapsed, loaded = run(statement)
+            times.append(elapsed * 1000)
+        print('{:<34} {:>9.2f} {:>9.2f} {:>8}'.format(
+            label, min(times), statistics.median(times), 'yes' if loaded else 'no'))
+
+    if args.top:
+        print()
+        for cumulative, name in slowest(SCENARIOS[2][1], args.top):
+            print('{:>9.2f} ms {}'.format(cumulative / 1000, name))
+
+
+if __name__ == '__main__':
+    main()
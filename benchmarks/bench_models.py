@@ -0,0 +1,54 @@
+"""Construction cost and memory per instance of the listing models.
+
+    python -m benchmarks.bench_models [count]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from asyncminehut import PartialServer, Plugin, Server
+
+from . import payloads
+
+
+def measure(label: str, build, items: list, repeat: int = 5) -> None:
+    elapsed = float('inf')
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build(items)
+            elapsed = min(elapsed, time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    objects = build(items)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+
+    print('{:<32} {:>9.2f} us/obj {:>9.0f} B/obj'.format(
+        label, elapsed / len(items) * 1e6, size / len(items)))
+
+
+def main(count: int = 20000) -> None:
+    rng = random.Random(0)
+    servers = payloads.servers(count)
+    full_servers = [payloads.full_server(index, rng) for index in range(count)]
+    plugins = payloads.plugins(count)
+
+    measure('PartialServer()', lambda items: [PartialServer(item) for item in items], servers)
+    measure('PartialServer() + 3 fields', lambda items: [
+        (server.name, server.player_count, server.visibility, server)
+        for server in map(PartialServer, items)], servers)
+    measure('Server()', lambda items: [Server(None, item) for item in items], full_servers)
+    measure('Plugin()', lambda items: [Plugin(item) for item in items], plugins)
+    measure('Plugin() + name', lambda items: [
+        (plugin.name, plugin) for plugin in map(Plugin, items)], plugins)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,162 @@
+"""A local stand-in for the Minehut API serving synthetic payloads.
+
+    python -m benchmarks.mock [--servers N] [--plugins N] [--latency S] [--error-rate P] [--port P]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+from typing import Optional, Tuple
+
+from aiohttp import web
+
+from . import payloads
+
+
+class MockAPI:
+    """Serves every route ``Client`` and ``Server`` use.
+
+    ``latency`` (plus up to ``jitter``) is added to each response; ``error_rate``
+    of requests fail with a 503 and ``throttle_rate`` with a 429 and a
+    ``Retry-After`` of ``retry_after`` seconds. Listings are encoded once up
+    front so the mock is not the bottleneck."""
+
+    def __init__(self, servers: int = 10000, plugins: int = 2000, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1.0,
+                 seed: int = 0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._seed = seed
+
+        listing = payloads.servers(servers, seed)
+        self._names = {server['name'].lower(): index for index, server in enumerate(listing)}
+        self._count = servers
+        self._servers = json.dumps({
+            'servers': listing,
+            'total_players': sum(server['playerData']['playerCount'] for server in listing),
+            'total_servers': servers,
+        }).encode()
+        top = sorted(listing, key=lambda server: -server['playerData']['playerCount'])[:5]
+        self._top = json.dumps({'servers': top}).encode()
+        self._plugins = json.dumps({'all': payloads.plugins(plugins, seed)}).encode()
+        self._runner: Optional[web.AppRunner] = None
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._inject])
+        app.router.add_get('/servers', self._static(lambda: self._servers))
+        app.router.add_get('/network/top_servers', self._static(lambda: self._top))
+        app.router.add_get('/plugins_public', self._static(lambda: self._plugins))
+        app.router.add_get('/server/{server}', self._server)
+        app.router.add_get('/network/simple_stats', self._simple_stats)
+        app.router.add_get('/network/homepage_stats', self._homepage_stats)
+        app.router.add_get('/network/players/distribution', self._distribution)
+        app.router.add_post('/servers/create', self._ok)
+        app.router.add_post('/server/{server}/{action:.+}', self._ok)
+        return app
+
+    @web.middleware
+    async def _inject(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._rng.random() * self.jitter)
+        roll = self._rng.random()
+        if roll < self.error_rate:
+            return web.Response(status=503, text='<pre>Injected failure</pre>', content_type='text/html')
+        if roll < self.error_rate + self.throttle_rate:
+            return web.Response(status=429, text='<pre>Too many requests</pre>', content_type='text/html',
+                                headers={'Retry-After': str(self.retry_after)})
+        return await handler(request)
+
+    @staticmethod
+    def _static(body):
+        async def handler(request: web.Request) -> web.Response:
+            return web.Response(body=body(), content_type='application/json')
+        return handler
+
+    async def _server(self, request: web.Request) -> web.Response:
+        key = request.match_info['server']
+        if request.query.get('byName') == 'true':
+            index = self._names.get(key.lower())
+        else:
+            try:
+                index = int(key, 16)
+            except ValueError:
+                index = None
+        if index is None or not 0 <= index < self._count:
+            return web.json_response({'ok': False})
+        return web.json_response({'server': payloads.full_server(index, random.Random(self._seed + index))})
+
+    async def _simple_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({'player_count': self._rng.randrange(10000), 'server_count': self._count,
+                                  'server_max': self._count * 2, 'ram_count': self._count * 1024,
+                                  'ram_max': self._count * 2048})
+
+    async def _homepage_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({'server_count': self._count, 'user_count': self._count * 40})
+
+    async def _distribution(self, request: web.Request) -> web.Response:
+        rng = self._rng
+        return web.json_response({'bedrockTotal': rng.randrange(3000), 'javaTotal': rng.randrange(7000),
+                                  'bedrockLobby': rng.randrange(500), 'bedrockPlayerServer': rng.randrange(2500),
+                                  'javaLobby': rng.randrange(1000), 'javaPlayerServer': rng.randrange(6000)})
+
+    async def _ok(self, request: web.Request) -> web.Response:
+        await request.read()
+        return web.json_response({'ok': True})
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Starts serving in the running loop and returns the base url."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return 'http://{}:{}'.format(host, port)
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def _serve(options: dict, host: str, port: int, ready) -> None:
+    async def main() -> None:
+        mock = MockAPI(**options)
+        ready.send(await mock.start(host, port))
+        await asyncio.Event().wait()
+    asyncio.run(main())
+
+
+def spawn(host: str = '127.0.0.1', port: int = 0, **options) -> Tuple[multiprocessing.Process, str]:
+    """Runs a ``MockAPI`` in its own process so it does not compete with the
+    client for the event loop, returning the process and its base url."""
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_serve, args=(options, host, port, sender), daemon=True)
+    process.start()
+    return process, receiver.recv()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--servers', type=int, default=10000)
+    parser.add_argument('--plugins', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    mock = MockAPI(servers=args.servers, plugins=args.plugins, latency=args.latency, jitter=args.jitter,
+                   error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    web.run_app(mock.app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
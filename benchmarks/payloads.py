@@ -0,0 +1,102 @@
+"""Synthetic Minehut API payloads shaped like the real responses."""
+import random
+from typing import List
+
+PLANS = ('FREE', 'DAILY', 'MH20', 'MH35', 'MH75', 'MHUNLIMITED')
+VISIBILITIES = (True, False)
+PLATFORMS = ('java', 'bedrock')
+WORDS = ('survival', 'skyblock', 'factions', 'prison', 'minigames', 'creative', 'pvp', 'smp', 'economy',
+         'bedwars', 'parkour', 'towny', 'anarchy', 'vanilla', 'modded', 'rpg', 'hardcore', 'friendly')
+EPOCH_MS = 1_600_000_000_000
+
+
+def server(index: int, rng: random.Random) -> dict:
+    """A single entry of the /servers listing."""
+    plan = rng.choice(PLANS)
+    max_players = rng.choice((10, 20, 40, 60, 100))
+    return {
+        'staticInfo': {
+            '_id': '%024x' % index,
+            'rawPlan': plan,
+            'planMaxPlayers': max_players,
+            'serviceStartDate': EPOCH_MS + rng.randrange(10 ** 10),
+            'platform': rng.choice(PLATFORMS),
+        },
+        'maxPlayers': max_players,
+        'name': '{}{}'.format(rng.choice(WORDS), index),
+        'motd': ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(3, 9))),
+        'icon': 'GRASS_BLOCK',
+        'visibility': rng.choice(VISIBILITIES),
+        'saveData': {'lastSave': EPOCH_MS + rng.randrange(10 ** 10)},
+        'playerData': {'playerCount': rng.randrange(max_players + 1), 'timeNoPlayers': 0},
+        'podInfo': {'instance': 'pod-{}'.format(index % 97), 'instance-sidecar': 'sidecar-{}'.format(index % 97)},
+    }
+
+
+def servers(count: int, seed: int = 0) -> List[dict]:
+    """The servers array of the /servers listing."""
+    rng = random.Random(seed)
+    return [server(index, rng) for index in range(count)]
+
+
+def full_server(index: int, rng: random.Random) -> dict:
+    """The server object of /server/{id}."""
+    partial = server(index, rng)
+    return {
+        '_id': partial['staticInfo']['_id'],
+        'name': partial['name'],
+        'name_lower': partial['name'].lower(),
+        'motd': partial['motd'],
+        'visibility': partial['visibility'],
+        'owner': '%024x' % (index * 7),
+        'storage_node': 'storage-{}'.format(index % 13),
+        'creation': EPOCH_MS + rng.randrange(10 ** 10),
+        'last_online': EPOCH_MS + rng.randrange(10 ** 10),
+        'credits_per_day': rng.choice((0, 5, 10, 20)),
+        'icon': 'GRASS_BLOCK',
+        'online': rng.random() < 0.5,
+        'max_players': partial['maxPlayers'],
+        'player_count': partial['playerData']['playerCount'],
+        'rawPlan': partial['staticInfo']['rawPlan'],
+        'categories': [],
+        'purchased_icons': [],
+        'backup_slots': 0,
+        'suspended': False,
+        'installed_content_packs': [],
+        'server_version_type': 'PAPER',
+        'active_plugins': ['%024x' % rng.randrange(10 ** 6) for _ in range(rng.randrange(6))],
+        'server_properties': {
+            'max_players': partial['maxPlayers'], 'gamemode': 'survival', 'allow_flight': False,
+            'spawn_animals': True, 'spawn_mobs': True, 'force_gamemode': False, 'hardcore': False,
+            'pvp': True, 'difficulty': 'easy', 'level_seed': '', 'allow_nether': True,
+            'generate_structures': True, 'enable_command_block': False, 'level_type': 'DEFAULT',
+            'level_name': 'world', 'generator_settings': '', 'resource_pack': '',
+            'resource_pack_sha1': '', 'view_distance': 10, 'spawn_protection': 0,
+        },
+    }
+
+
+def plugin(index: int, rng: random.Random) -> dict:
+    """A single entry of /plugins_public."""
+    name = '{}{}'.format(rng.choice(WORDS).capitalize(), index)
+    words = ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(20, 80)))
+    return {
+        '_id': '%024x' % (10 ** 6 + index),
+        'name': name,
+        'credits': 'author{}'.format(index % 211),
+        'platform': rng.choice(PLATFORMS),
+        'desc': ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(4, 12))),
+        'desc_extended': '{} https://www.spigotmc.org/resources/{}.{}/'.format(words, name.lower(), index),
+        'html_desc_extended': '<p>{}</p>'.format(words),
+        'version': '1.{}.{}'.format(index % 20, index % 7),
+        'disabled': rng.random() < 0.05,
+        'file_name': '{}.jar'.format(name),
+        'created': EPOCH_MS + rng.randrange(10 ** 10),
+        'last_updated': EPOCH_MS + rng.randrange(10 ** 10),
+    }
+
+
+def plugins(count: int, seed: int = 0) -> List[dict]:
+    """The all array of /plugins_public."""
+    rng = random.Random(seed)
+    return [plugin(index, rng) for index in range(count)]
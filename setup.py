@@ -15,8 +15,9 @@ setup(
     include_package_data=True,
     url="https://github.com/SuperOrca/asyncminehut",
     author="SuperOrca",
-    packages=find_packages(),
+    packages=find_packages(exclude=('benchmarks', 'benchmarks.*')),
     install_requires=["aiohttp", "datetime"],
+    extras_require={"speed": ["orjson"]},
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from asyncminehut import Client, ResponseCache, ServerOnline, Unauthorized
+
+
+async def serve(app: web.Application) -> web.AppRunner:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner
+
+
+def base_url(runner: web.AppRunner) -> str:
+    host, port = runner.addresses[0][:2]
+    return 'http://{}:{}'.format(host, port)
+
+
+def test_retry_backoff_holds_no_slot(monkeypatch):
+    monkeypatch.setattr('asyncminehut.http.backoff', lambda attempt: 0.2)
+    calls = []
+
+    async def flaky(request):
+        calls.append(request.path)
+        if len(calls) == 1:
+            return web.Response(status=503)
+        return web.json_response({'ok': True})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/network/simple_stats', flaky)
+        runner = await serve(app)
+        client = Client(base_url=base_url(runner), limit_per_host=1)
+        try:
+            task = asyncio.ensure_future(client.get_simple_stats())
+            while not calls:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            assert client.scheduler.active == 0
+            await task
+            assert client.scheduler.active == 0
+        finally:
+            await client.close()
+            await runner.cleanup()
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_returned_response_can_be_read():
+    async def listing(request):
+        return web.json_response({'servers': []})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/servers', listing)
+        runner = await serve(app)
+        client = Client(base_url=base_url(runner))
+        try:
+            response = await client._http.get('/servers', to_json=False)
+            assert await response.read() == b'{"servers": []}'
+            assert await response.json() == {'servers': []}
+        finally:
+            await client.close()
+            await runner.cleanup()
+    asyncio.run(run())
+
+
+def test_watch_survives_a_failed_poll():
+    polls = []
+
+    async def listing(request):
+        polls.append(request.path)
+        if len(polls) == 2:
+            return web.Response(status=500)
+        online = [] if len(polls) == 1 else [{'staticInfo': {'_id': 'a'}, 'name': 'a', 'online': True}]
+        return web.json_response({'servers': online})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/servers', listing)
+        runner = await serve(app)
+        client = Client(base_url=base_url(runner), retries=0)
+        watch = client.watch_servers(interval=0.01)
+        try:
+            return await asyncio.wait_for(watch.__anext__(), 5)
+        finally:
+            await watch.aclose()
+            await client.close()
+            await runner.cleanup()
+    event = asyncio.run(run())
+    assert isinstance(event, ServerOnline)
+    assert len(polls) == 3
+
+
+def test_refresh_bypasses_the_cache():
+    motd = ['first']
+    server_id = '0' * 24
+
+    async def server(request):
+        return web.json_response({'server': {'_id': server_id, 'name': 'a', 'motd': motd[0]}})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/server/{server}', server)
+        runner = await serve(app)
+        client = Client(base_url=base_url(runner), cache=ResponseCache())
+        try:
+            found = await client.get_server_by_id(server_id)
+            motd[0] = 'second'
+            assert await found.refresh() == ['motd']
+            assert found.motd == 'second'
+            assert (await client.get_server_by_id(server_id)).motd == 'second'
+        finally:
+            await client.close()
+            await runner.cleanup()
+    asyncio.run(run())
+
+
+def test_refresh_plugins_bypasses_the_cache():
+    plugins = [[{'_id': 'a', 'name': 'First'}]]
+    requests = []
+
+    async def catalog(request):
+        requests.append(request.path)
+        return web.json_response({'all': plugins[0]})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/plugins_public', catalog)
+        runner = await serve(app)
+        client = Client(base_url=base_url(runner), cache=ResponseCache())
+        try:
+            assert [plugin.name async for plugin in client.get_all_plugins()] == ['First']
+            plugins[0] = [{'_id': 'b', 'name': 'Second'}]
+            await client.refresh_plugins()
+            assert [plugin.name async for plugin in client.get_all_plugins()] == ['Second']
+        finally:
+            await client.close()
+            await runner.cleanup()
+    asyncio.run(run())
+    assert len(requests) == 2
+
+
+def test_watch_raises_permanent_errors():
+    async def forbidden(request):
+        return web.Response(status=403)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/servers', forbidden)
+        runner = await serve(app)
+        client = Client(base_url=base_url(runner), retries=0)
+        watch = client.watch_servers(interval=0.01)
+        try:
+            with pytest.raises(Unauthorized):
+                await asyncio.wait_for(watch.__anext__(), 5)
+        finally:
+            await watch.aclose()
+            await client.close()
+            await runner.cleanup()
+    asyncio.run(run())
@@ -0,0 +1,16 @@
+from asyncminehut import Metrics
+
+
+def test_failing_exporter_is_skipped():
+    seen = []
+
+    def broken(sample):
+        raise RuntimeError('exporter down')
+
+    metrics = Metrics()
+    metrics.add_exporter(broken)
+    metrics.add_exporter(seen.append)
+    sample = metrics.start('GET', '/servers')
+    metrics.finish(sample)
+    assert seen == [sample]
+    assert metrics.routes['GET /servers'].requests == 1
@@ -0,0 +1,38 @@
+import datetime
+from email.utils import format_datetime
+
+import pytest
+
+from asyncminehut.ratelimit import retry_after
+
+
+def in_a_minute(usegmt):
+    when = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=60)
+    return format_datetime(when, usegmt=usegmt)
+
+
+def test_missing():
+    assert retry_after({}) is None
+
+
+@pytest.mark.parametrize('value, expected', [('120', 120.0), ('1.5', 1.5), ('-3', 0.0)])
+def test_seconds(value, expected):
+    assert retry_after({'Retry-After': value}) == expected
+
+
+def test_gmt_date():
+    assert 55 < retry_after({'Retry-After': in_a_minute(usegmt=True)}) <= 60
+
+
+def test_unknown_zone_date():
+    value = in_a_minute(usegmt=True).replace('GMT', '-0000')
+    assert 55 < retry_after({'Retry-After': value}) <= 60
+
+
+def test_past_date():
+    assert retry_after({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}) == 0.0
+
+
+@pytest.mark.parametrize('value', ['soon', '', 'Wed, 99 Foo 2015'])
+def test_garbage(value):
+    assert retry_after({'Retry-After': value}) is None
@@ -0,0 +1,53 @@
+from asyncminehut.recorder import Series
+
+HOUR = 1000 * 3600.0
+
+
+def series(count, step=10.0, **capacities):
+    recorded = Series(**capacities)
+    for index in range(count):
+        recorded.append(HOUR + step * index, float(index))
+    return recorded
+
+
+def test_range_uses_raw_samples_while_they_last():
+    recorded = series(390)
+    samples = recorded.range()
+    assert len(samples) == 390
+    assert samples[-1] == (HOUR + 3890, 389.0)
+    assert recorded.rate() == 0.1
+    assert recorded.percentile(100) == 389.0
+
+
+def test_range_fills_in_from_rollups():
+    recorded = series(390, raw_capacity=30)
+    samples = recorded.range()
+    times = [when for when, _ in samples]
+    assert times == sorted(times)
+    # Raw covers the last 5 minutes, whole minutes before that come from the minute tier.
+    assert samples[-30:] == [(HOUR + 10 * index, float(index)) for index in range(360, 390)]
+    assert samples[0] == (HOUR, 2.5)
+    assert times[-31] == HOUR + 3540
+
+
+def test_range_uses_hours_before_minutes():
+    recorded = series(3 * 60 + 5, step=60.0, raw_capacity=5, minute_capacity=30)
+    times = [when for when, _ in recorded.range()]
+    # The hour holding the oldest minute bucket is left out rather than counted twice.
+    assert times[:2] == [HOUR, HOUR + 3600]
+    assert times[2:28] == [HOUR + 60 * index for index in range(154, 180)]
+    assert times[28:] == [HOUR + 60 * index for index in range(180, 185)]
+
+
+def test_range_within_window():
+    recorded = series(390, raw_capacity=30)
+    assert recorded.range(HOUR + 3600, HOUR + 3700) == [
+        (HOUR + 3600, 360.0), (HOUR + 3610, 361.0), (HOUR + 3620, 362.0), (HOUR + 3630, 363.0),
+        (HOUR + 3640, 364.0), (HOUR + 3650, 365.0), (HOUR + 3660, 366.0), (HOUR + 3670, 367.0),
+        (HOUR + 3680, 368.0), (HOUR + 3690, 369.0)]
+    assert recorded.range(HOUR, HOUR + 120) == [(HOUR, 2.5), (HOUR + 60, 8.5)]
+
+
+def test_empty():
+    assert Series().range() == []
+    assert Series().rate() is None
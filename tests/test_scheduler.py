@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from asyncminehut import Client, RequestScheduler
+
+
+@pytest.mark.parametrize('concurrency', [0, None])
+def test_unbounded(concurrency):
+    assert RequestScheduler(concurrency).concurrency is None
+
+
+@pytest.mark.parametrize('concurrency, expected', [(1, 0), (2, 1), (32, 2)])
+def test_small_budgets_reserve_what_they_can(concurrency, expected):
+    assert RequestScheduler(concurrency, reserved=2).reserved == expected
+
+
+def test_negative_reserved():
+    with pytest.raises(ValueError):
+        RequestScheduler(4, -1)
+
+
+@pytest.mark.parametrize('limit, limit_per_host, expected', [
+    (100, 0, 100),
+    (0, 0, None),
+    (100, 1, 1),
+    (8, 32, 8),
+])
+def test_client_budget(limit, limit_per_host, expected):
+    assert Client(limit=limit, limit_per_host=limit_per_host).scheduler.concurrency == expected
+
+
+def test_client_budget_from_connector():
+    import aiohttp
+
+    async def run():
+        connector = aiohttp.TCPConnector(limit=50, limit_per_host=6)
+        session = aiohttp.ClientSession(connector=connector)
+        try:
+            assert Client(connector=connector).scheduler.concurrency == 6
+            assert Client(session=session, limit_per_host=1).scheduler.concurrency == 6
+        finally:
+            await session.close()
+    asyncio.run(run())
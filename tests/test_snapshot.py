@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from asyncminehut import ServerSnapshot
+from asyncminehut.snapshot import decode_snapshot
+
+
+def server(index, plan='FREE', name='', visibility=True, players=0):
+    static = {'_id': '%024x' % index}
+    if plan is not None:
+        static['rawPlan'] = plan
+    return {'staticInfo': static, 'name': name if name != '' else 'server{}'.format(index),
+            'visibility': visibility, 'playerData': {'playerCount': players}}
+
+
+@pytest.fixture
+def snapshot():
+    return ServerSnapshot.from_servers([
+        server(0, plan='MH20', players=5),
+        server(1, plan=None, name=None, visibility=None, players=9),
+        server(2, plan='DAILY', players=1),
+    ])
+
+
+@pytest.mark.parametrize('column', ['plan', 'visibility', 'names'])
+def test_sort_with_missing_values(snapshot, column):
+    rows = snapshot.sort(column)
+    assert len(rows) == 3
+    assert len(snapshot.top(column, 2)) == 2
+
+
+def test_sort_puts_missing_first(snapshot):
+    assert list(snapshot.sort('plan').column('plan')) == [None, 'DAILY', 'MH20']
+    assert list(snapshot.top('plan', 1).column('plan')) == ['MH20']
+
+
+@pytest.mark.parametrize('call', [
+    lambda snapshot: snapshot.group_by('player_count'),
+    lambda snapshot: snapshot.count_by('names'),
+    lambda snapshot: snapshot.aggregate('plan', 'visibility'),
+])
+def test_grouping_rejects_other_columns(snapshot, call):
+    with pytest.raises(KeyError):
+        call(snapshot)
+
+
+def test_compact_rows_use_the_snapshot_decoder():
+    decoded = []
+
+    def loads(body):
+        decoded.append(body)
+        return json.loads(body)
+
+    body = json.dumps({'servers': [server(0), server(1)]}).encode()
+    snapshot = decode_snapshot(json.loads, body, compact=True)
+    snapshot.loads = loads
+    assert snapshot.server(1).name == 'server1'
+    assert [partial.name for partial in snapshot.top('player_count', 2)] == ['server0', 'server1']
+    assert len(decoded) == 3
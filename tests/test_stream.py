@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import pytest
+
+from asyncminehut.stream import iter_array
+
+
+async def _chunks(parts):
+    for part in parts:
+        yield part
+
+
+def collect(parts, key='servers'):
+    async def run():
+        return [item async for item in iter_array(_chunks(parts), key)]
+    return asyncio.run(run())
+
+
+def split_everywhere(body: bytes):
+    for index in range(1, len(body)):
+        yield [body[:index], body[index:]]
+
+
+@pytest.mark.parametrize('parts, expected', [
+    ([b'{"servers":[4.', b'5]}'], [4.5]),
+    ([b'{"servers":[12e', b'3]}'], [12e3]),
+    ([b'{"servers":[1', b'2,3]}'], [12, 3]),
+    ([b'{"servers":[-', b'1e-', b'2]}'], [-1e-2]),
+    ([b'{"count":1', b'.25,"servers":[]}'], []),
+    ([b'{"servers":[tr', b'ue,null]}'], [True, None]),
+])
+def test_number_split_at_chunk_boundary(parts, expected):
+    assert collect(parts) == expected
+
+
+def test_every_split_point():
+    data = {'total': 3.5e2, 'servers': [{'name': 'aé', 'players': 12}, 4.75, -1e-3, [1, 2], 'x'], 'tail': 0}
+    body = json.dumps(data).encode()
+    for parts in split_everywhere(body):
+        assert collect(parts) == data['servers'], parts
+
+
+def test_missing_key():
+    assert collect([b'{"other":[1,2]}']) == []
+
+
+def test_truncated_stream():
+    with pytest.raises(ValueError):
+        collect([b'{"servers":[1,'])